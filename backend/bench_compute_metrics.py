@@ -0,0 +1,90 @@
+"""
+Benchmark for gex_logic.compute_metrics.
+
+Compares the fused kernel against the previous column-at-a-time pandas
+implementation on a synthetic chain: per-call latency (perf_counter) and
+allocation count / peak traced memory (tracemalloc). Output parity with the
+reference is covered by tests/test_gex_kernel.py.
+
+    python bench_compute_metrics.py [n_strikes] [repeats]
+"""
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import gex_kernel
+from gex_logic import compute_metrics
+
+
+def compute_metrics_reference(df, spot_price, contract_size=75, vol=0.2, T=0.25):
+    """The original pandas implementation, kept here as the baseline."""
+    df["d1"] = np.log(spot_price / df["Strike Price"]) + 0.5 * vol ** 2 * T
+    df["d1"] = df["d1"] / (vol * np.sqrt(T))
+    df["Vega"] = spot_price * np.sqrt(T) * (1 / np.sqrt(2 * np.pi)) * np.exp(-0.5 * df["d1"] ** 2)
+    df["Vanna"] = - df["d1"] * df["Vega"] / (spot_price * vol)
+
+    df["Dealer OI"] = df["OI"] * contract_size
+    df["Dealer Delta Exposure"] = df["Dealer OI"] * df["Delta"]
+    df["Dealer Vanna Exposure"] = df["Dealer OI"] * df["Vanna"]
+    df["GEX"] = df["OI"] * contract_size * df["Gamma"] * (spot_price ** 2)
+    df["GEX_1pct"] = df["GEX"] * 0.0201
+    df["Cumulative GEX"] = df.groupby("OptionType")["GEX"].cumsum()
+    df["Cumulative Dealer Delta"] = df.groupby("OptionType")["Dealer Delta Exposure"].cumsum()
+    df["VegaTheta_Ratio"] = np.where(df["Theta"] != 0, df["Vega"] / np.abs(df["Theta"]), np.nan)
+
+    return df
+
+
+def make_chain(n_strikes, spot=24000, step=5, seed=0):
+    rng = np.random.default_rng(seed)
+    strikes = spot + step * (np.arange(n_strikes) - n_strikes // 2)
+    rows = 2 * n_strikes
+    df = pd.DataFrame({
+        "Strike Price": np.repeat(strikes, 2).astype(float),
+        "OI": rng.integers(0, 50_000, rows).astype(float),
+        "Delta": rng.uniform(-1, 1, rows),
+        "Gamma": rng.uniform(0, 0.002, rows),
+        "Theta": rng.uniform(-20, 0, rows),
+        "OptionType": np.tile(["C", "P"], n_strikes),
+    })
+    df.loc[::17, "Theta"] = 0.0
+    return df
+
+
+def measure(fn, df, repeats):
+    fn(df.copy(), 24000, 75, 0.15, 0.05)  # warm-up (Numba compile, caches)
+
+    inputs = [df.copy() for _ in range(repeats)]
+    t0 = time.perf_counter()
+    for d in inputs:
+        fn(d, 24000, 75, 0.15, 0.05)
+    latency = (time.perf_counter() - t0) / repeats
+
+    d = df.copy()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    fn(d, 24000, 75, 0.15, 0.05)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    allocs = sum(s.count_diff for s in after.compare_to(before, "lineno") if s.count_diff > 0)
+    return latency, allocs, peak
+
+
+def main():
+    n_strikes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    df = make_chain(n_strikes)
+
+    print(f"rows={len(df)} repeats={repeats} numba={gex_kernel.HAVE_NUMBA}")
+    for name, fn in (("reference", compute_metrics_reference), ("fused", compute_metrics)):
+        latency, allocs, peak = measure(fn, df, repeats)
+        print(f"{name:>9}: {latency * 1e3:8.3f} ms/call  {allocs:6d} allocations  "
+              f"peak {peak / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
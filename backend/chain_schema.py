@@ -0,0 +1,175 @@
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from gex_logic import detect_columns_keyword_based, build_call_put_dataframe
+
+# ------------------------------------------------------------------------------------
+# Registry of known broker option-chain export layouts.
+#
+# A layout is identified by a fingerprint of its header row. Known layouts are read
+# straight into float64 with usecols (no object columns, no keyword detection);
+# unknown layouts go through detect_columns_keyword_based once and are registered,
+# so every later upload in the same format takes the fast path.
+# ------------------------------------------------------------------------------------
+REGISTRY_PATH = os.environ.get(
+    "GEX_SCHEMA_REGISTRY_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "chain_schemas.json"),
+)
+
+FIELDS = ("oi", "delta", "gamma", "theta")
+NA_VALUES = ["-", "--", "", "NA", "N/A"]
+MAX_HEADER_SKIP = 10
+
+
+def header_fingerprint(columns, kind: str = "csv", skiprows: int = 0) -> str:
+    """
+    Identifies a layout by file kind, header position and header names, so an Excel
+    export with title rows never shares an entry with a bare CSV of the same header.
+    """
+    normalized = "\x1f".join([kind, str(skiprows)] + [str(c).strip().lower() for c in columns])
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+class SchemaRegistry:
+    """
+    fingerprint -> {"skiprows", "strike", "call": {field: pos}, "put": {field: pos}},
+    with absolute column positions. Persisted as JSON so layouts survive restarts.
+    """
+
+    def __init__(self, path: str = REGISTRY_PATH):
+        self.path = path
+        self._schemas = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as fh:
+                    self._schemas = json.load(fh)
+            except (OSError, ValueError) as e:
+                print(f"[SCHEMA] Ignoring unreadable registry {path}: {e}")
+
+    def get(self, fingerprint: str):
+        return self._schemas.get(fingerprint)
+
+    def register(self, fingerprint: str, schema: dict):
+        self._schemas[fingerprint] = schema
+        if not self.path:
+            return
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump(self._schemas, fh, indent=1)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[SCHEMA] Could not persist registry: {e}")
+
+    def __len__(self):
+        return len(self._schemas)
+
+
+registry = SchemaRegistry()
+
+
+def _is_excel(filename: str) -> bool:
+    return filename.endswith((".xls", ".xlsx"))
+
+
+def _read(content: bytes, filename: str, **kwargs) -> pd.DataFrame:
+    if _is_excel(filename):
+        return pd.read_excel(io.BytesIO(content), engine="openpyxl", **kwargs)
+    return pd.read_csv(io.BytesIO(content), **kwargs)
+
+
+def _read_header(content: bytes, filename: str):
+    """
+    Returns (skiprows, columns) of the header row. CSVs are expected to start with
+    the header; Excel sheets may have up to MAX_HEADER_SKIP title rows above it.
+    """
+    skips = range(MAX_HEADER_SKIP) if _is_excel(filename) else (0,)
+    for skip in skips:
+        columns = _read(content, filename, skiprows=skip, nrows=0).columns
+        if any("strike" in col.lower() for col in columns if isinstance(col, str)):
+            return skip, columns
+    raise ValueError(f"No 'Strike Price' column found in first {MAX_HEADER_SKIP} rows.")
+
+
+def _detect_schema(df: pd.DataFrame, skiprows: int) -> dict:
+    strike_col = next(c for c in df.columns if isinstance(c, str) and "strike" in c.lower())
+    strike_pos = df.columns.get_loc(strike_col)
+    _, _, _, call_idx, put_idx = detect_columns_keyword_based(df, strike_col=strike_col)
+    return {
+        "skiprows": skiprows,
+        "strike": strike_pos,
+        "call": {f: call_idx[f] for f in FIELDS},
+        "put": {f: strike_pos + 1 + put_idx[f] for f in FIELDS},
+    }
+
+
+def _typed_chain(content: bytes, filename: str, schema: dict, skiprows: int) -> pd.DataFrame:
+    """
+    Reads only the mapped columns as float64 and lays them out in the same long
+    call/put format as build_call_put_dataframe.
+    """
+    positions = [schema["strike"]]
+    positions += [schema["call"][f] for f in FIELDS] + [schema["put"][f] for f in FIELDS]
+    usecols = sorted(set(positions))
+
+    raw = _read(
+        content, filename,
+        skiprows=skiprows, usecols=usecols, dtype=np.float64,
+        na_values=NA_VALUES, **({} if _is_excel(filename) else {"thousands": ","}),
+    )
+    # usecols returns columns in file order; index them by absolute position
+    values = np.nan_to_num(raw.to_numpy(dtype=np.float64), nan=0.0)
+    col_of = {pos: i for i, pos in enumerate(usecols)}
+
+    n = len(values)
+    out = {"Strike Price": np.repeat(values[:, col_of[schema["strike"]]], 2)}
+    for f, name in zip(FIELDS, ("OI", "Delta", "Gamma", "Theta")):
+        col = np.empty(2 * n, dtype=np.float64)
+        col[0::2] = values[:, col_of[schema["call"][f]]]
+        col[1::2] = values[:, col_of[schema["put"][f]]]
+        out[name] = col
+    out["OptionType"] = np.tile(np.array(["C", "P"], dtype=object), n)
+
+    out_df = pd.DataFrame(out)
+    out_df.sort_values("Strike Price", inplace=True, kind="stable")
+    out_df.reset_index(drop=True, inplace=True)
+    return out_df
+
+
+def _coerced_chain(df: pd.DataFrame, schema: dict) -> pd.DataFrame:
+    strike_pos = schema["strike"]
+    call_idx = dict(schema["call"])
+    put_idx = {f: pos - strike_pos - 1 for f, pos in schema["put"].items()}
+    return build_call_put_dataframe(
+        df.iloc[:, :strike_pos], df.iloc[:, strike_pos + 1:], df.iloc[:, strike_pos],
+        call_idx, put_idx,
+    )
+
+
+def read_option_chain(content: bytes, filename: str, schemas: SchemaRegistry = registry) -> pd.DataFrame:
+    """
+    Parses an uploaded broker export into the long call/put frame
+    (Strike Price, OI, Delta, Gamma, Theta, OptionType) used by compute_metrics.
+    """
+    skiprows, columns = _read_header(content, filename)
+    kind = "excel" if _is_excel(filename) else "csv"
+    fingerprint = header_fingerprint(columns, kind, skiprows)
+
+    schema = schemas.get(fingerprint)
+    if schema is not None:
+        try:
+            return _typed_chain(content, filename, schema, skiprows)
+        except (ValueError, IndexError, KeyError) as e:
+            # non-numeric cells or a drifted layout: fall through to detection
+            print(f"[SCHEMA] Typed read failed for {fingerprint[:10]}: {e}")
+
+    df = _read(content, filename, skiprows=skiprows)
+    schema = _detect_schema(df, skiprows)
+    schemas.register(fingerprint, schema)
+    print(f"[SCHEMA] Registered layout {fingerprint[:10]} ({len(schemas)} known)")
+    return _coerced_chain(df, schema)
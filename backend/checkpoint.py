@@ -0,0 +1,153 @@
+import gzip
+import json
+import os
+import time
+import asyncio
+
+import shared_state
+import globaldata_ws
+from rolling_analytics import live_analytics
+from oi_flow import live_oi_flow
+
+# ------------------------------------------------------------------------------------
+# Warm-start checkpoints: the live chain, rolling analytics/trending history, the OI flow
+# matrix and the last /start_stream configuration are written to disk periodically so a
+# restart can serve immediately (marked stale) and resume the stream on its own.
+# ------------------------------------------------------------------------------------
+CHECKPOINT_PATH = os.environ.get(
+    "GEX_CHECKPOINT_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "gex_checkpoint.json.gz"),
+)
+CHECKPOINT_INTERVAL = float(os.environ.get("GEX_CHECKPOINT_INTERVAL", 30))
+# Checkpoints older than this are ignored on startup (e.g. yesterday's session).
+CHECKPOINT_MAX_AGE = float(os.environ.get("GEX_CHECKPOINT_MAX_AGE", 12 * 3600))
+
+CHECKPOINT_VERSION = 2
+
+
+def _latest_tick_per_instrument(ticks: list) -> list:
+    """
+    live_ticks_cache is append-only (up to 5000 entries), but parse_option_data only
+    ever uses the last tick per instrument, so that is all we persist.
+    """
+    latest = {}
+    for tick in ticks:
+        latest[tick.get("InstrumentIdentifier", "")] = tick
+    return list(latest.values())
+
+
+def build_snapshot() -> dict:
+    return {
+        "version": CHECKPOINT_VERSION,
+        "saved_at": time.time(),
+        "stream_config": dict(shared_state.live_stream_config),
+        "live_center_spot": shared_state.live_center_spot,
+        "live_strike_range": shared_state.live_strike_range,
+        "live_contract_step": shared_state.live_contract_step,
+        "live_spot": shared_state.live_spot,
+        "live_ticks": _latest_tick_per_instrument(globaldata_ws.live_ticks_cache),
+        "live_quotes": globaldata_ws.live_quotes,
+        "live_analytics_events": live_analytics.dump_events(),
+        "live_analytics_ema": live_analytics.dump_ema(),
+        "oi_flow": live_oi_flow.dump(),
+        "trending_history": list(shared_state.trending_history),
+    }
+
+
+def save_checkpoint(path: str = CHECKPOINT_PATH) -> bool:
+    """
+    Writes the current state atomically (temp file + rename) so a crash mid-write
+    never leaves a truncated checkpoint behind. Returns False when there is
+    nothing worth saving yet.
+    """
+    if not shared_state.live_stream_config and not shared_state.trending_history:
+        return False
+
+    snapshot = build_snapshot()
+    tmp_path = path + ".tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as fh:
+        json.dump(snapshot, fh, separators=(",", ":"))
+    os.replace(tmp_path, path)
+    return True
+
+
+def load_checkpoint(path: str = CHECKPOINT_PATH, max_age: float = CHECKPOINT_MAX_AGE):
+    """
+    Returns the checkpoint dict, or None if it is missing, unreadable, from another
+    format version or older than max_age seconds.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            snapshot = json.load(fh)
+    except (OSError, ValueError) as e:
+        print(f"[CKPT] Ignoring unreadable checkpoint {path}: {e}")
+        return None
+
+    if not isinstance(snapshot, dict):
+        print(f"[CKPT] Ignoring checkpoint {path}: not a JSON object")
+        return None
+    if snapshot.get("version") != CHECKPOINT_VERSION:
+        print(f"[CKPT] Ignoring checkpoint with version {snapshot.get('version')}")
+        return None
+    age = time.time() - float(snapshot.get("saved_at", 0))
+    if age > max_age:
+        print(f"[CKPT] Ignoring checkpoint that is {age:.0f}s old")
+        return None
+    return snapshot
+
+
+def restore_checkpoint(snapshot: dict):
+    """
+    Puts a loaded checkpoint back into shared_state / globaldata_ws and marks the
+    live data as stale until the first fresh tick arrives from the feed.
+    """
+    shared_state.live_stream_config = dict(snapshot.get("stream_config") or {})
+    shared_state.live_center_spot = snapshot.get("live_center_spot", 0)
+    shared_state.live_strike_range = snapshot.get("live_strike_range", shared_state.live_strike_range)
+    shared_state.live_contract_step = snapshot.get("live_contract_step", shared_state.live_contract_step)
+
+    live_analytics.reset()
+    live_analytics.replay(snapshot.get("live_analytics_events", []))
+    live_analytics.load_ema(snapshot.get("live_analytics_ema"))
+    live_oi_flow.restore(snapshot.get("oi_flow"))
+    shared_state.trending_history.clear()
+    shared_state.trending_history.extend(snapshot.get("trending_history", []))
+
+    shared_state.live_spot = snapshot.get("live_spot", 0.0)
+    globaldata_ws.live_ticks_cache[:] = snapshot.get("live_ticks", [])
+    globaldata_ws.live_quotes.clear()
+    globaldata_ws.live_quotes.update(snapshot.get("live_quotes", {}))
+    shared_state.live_restored_at = snapshot.get("saved_at")
+    print(
+        f"[CKPT] Restored {len(globaldata_ws.live_ticks_cache)} ticks, "
+        f"{len(shared_state.trending_history)} trending rows"
+    )
+
+
+def resume_stream():
+    """
+    Re-launches the WebSocket consumer with the persisted /start_stream parameters.
+    The restored cache is kept so /live_data keeps serving while the feed reconnects.
+    """
+    cfg = shared_state.live_stream_config
+    if not cfg.get("symbol") or not cfg.get("expiry"):
+        return False
+    globaldata_ws.start_background_ws_loop(
+        symbol=cfg["symbol"],
+        expiry=cfg["expiry"],
+        spot=int(cfg.get("spot", 0)),
+        strike_range=int(cfg.get("strike_range", shared_state.live_strike_range)),
+        contract_step=int(cfg.get("contract_step", shared_state.live_contract_step)),
+    )
+    return True
+
+
+async def checkpoint_loop(interval: float = CHECKPOINT_INTERVAL):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            save_checkpoint()
+        except Exception as e:
+            print(f"[CKPT] Failed to write checkpoint: {e}")
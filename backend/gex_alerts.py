@@ -0,0 +1,390 @@
+import asyncio
+import ipaddress
+import json
+import math
+import queue
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections import deque
+
+import numpy as np
+
+# ------------------------------------------------------------------------------------
+# Alert rule engine, evaluated once per chain version.
+#
+# Rules are plain dicts (JSON-friendly):
+#   {"id": "spot-x-zg", "metric": "spot", "op": "cross_below", "value": "zero_gamma",
+#    "debounce": 60, "symbol": "NIFTY", "sinks": ["log", "stream"]}
+#   {"id": "oi-24000", "metric": "oi_change", "strike": 24000, "op": ">", "value": 50000}
+#
+# metric / value: one of SCALAR_METRICS, "oi_change" (needs "strike"; OI change versus
+# the session open at that strike), or a constant for value.
+# op: >, <, >=, <=, cross_above, cross_below, cross (either way) and changed (the
+# metric itself moved, e.g. gamma_wall or sentiment). Threshold ops are edge-triggered:
+# they fire when the condition becomes true and re-arm once it clears.
+#
+# Rules are compiled per symbol into flat NumPy arrays (lhs/rhs slot indices,
+# constants, op codes, debounce, last fire time, previous values), so one update is
+# a handful of vectorised operations regardless of the number of rules. Delivery to
+# sinks is non-blocking.
+# ------------------------------------------------------------------------------------
+SCALAR_METRICS = ("spot", "net_gex", "zero_gamma", "gamma_wall", "sentiment", "dealer_delta")
+OPS = (">", "<", ">=", "<=", "cross_above", "cross_below", "cross", "changed")
+GT, LT, GE, LE, CROSS_ABOVE, CROSS_BELOW, CROSS, CHANGED = range(len(OPS))
+
+# Sentiment labels mapped onto an ordinal scale so flips are numeric crossings of 0
+SENTIMENT_SCORES = {
+    "Bearish": -2.0, "Mildly Bearish": -1.0, "Neutral": 0.0, "Sideways": 0.0,
+    "Mildly Bullish": 1.0, "Bullish": 2.0,
+}
+
+DEFAULT_SINKS = ("log", "stream")
+BUILTIN_SINKS = ("log", "stream")
+
+
+def validate_webhook_url(url: str) -> str:
+    """
+    Webhooks are local integrations only: http(s) to a loopback host. Anything
+    else raises ValueError so the server never POSTs to arbitrary addresses.
+    """
+    parsed = urllib.parse.urlsplit(url or "")
+    if parsed.scheme not in ("http", "https"):
+        raise ValueError("Webhook URL must use http or https.")
+    host = (parsed.hostname or "").lower()
+    if host != "localhost":
+        try:
+            loopback = ipaddress.ip_address(host).is_loopback
+        except ValueError:
+            loopback = False
+        if not loopback:
+            raise ValueError("Webhook URL must point at a loopback host (localhost, 127.0.0.0/8, ::1).")
+    return url
+
+
+def validate_rule(rule: dict) -> dict:
+    """
+    Normalises a rule dict, raising ValueError with a readable message on bad input.
+    """
+    rule = dict(rule)
+    if not rule.get("id"):
+        raise ValueError("Rule needs an 'id'.")
+    metric = rule.get("metric")
+    if metric not in SCALAR_METRICS and metric != "oi_change":
+        raise ValueError(f"Rule {rule['id']}: unknown metric '{metric}'.")
+    if metric == "oi_change":
+        if rule.get("strike") is None:
+            raise ValueError(f"Rule {rule['id']}: 'oi_change' needs a 'strike'.")
+        rule["strike"] = int(rule["strike"])
+    if rule.get("op") not in OPS:
+        raise ValueError(f"Rule {rule['id']}: op must be one of {list(OPS)}.")
+
+    value = rule.get("value", 0.0)
+    if isinstance(value, str):
+        if value not in SCALAR_METRICS:
+            raise ValueError(f"Rule {rule['id']}: unknown reference metric '{value}'.")
+    else:
+        rule["value"] = float(value)
+    rule["debounce"] = float(rule.get("debounce", 0))
+    rule["sinks"] = list(rule.get("sinks") or DEFAULT_SINKS)
+    rule["symbol"] = rule.get("symbol") or None
+    return rule
+
+
+class _CompiledRules:
+    """
+    Flat arrays for every rule that applies to one symbol. Slots 0..len(SCALAR_METRICS)-1
+    of the state vector hold the scalar metrics; one extra slot per distinct
+    oi_change strike follows.
+    """
+
+    def __init__(self, rules: list, previous: "_CompiledRules" = None):
+        self.rules = rules
+        n = len(rules)
+        self.strikes = sorted({r["strike"] for r in rules if r["metric"] == "oi_change"})
+        strike_slot = {k: len(SCALAR_METRICS) + i for i, k in enumerate(self.strikes)}
+
+        def slot(rule):
+            if rule["metric"] == "oi_change":
+                return strike_slot[rule["strike"]]
+            return SCALAR_METRICS.index(rule["metric"])
+
+        self.lhs = np.array([slot(r) for r in rules], dtype=np.int64)
+        self.rhs = np.array(
+            [SCALAR_METRICS.index(r["value"]) if isinstance(r["value"], str) else -1 for r in rules],
+            dtype=np.int64,
+        )
+        self.const = np.array([0.0 if isinstance(r["value"], str) else r["value"] for r in rules])
+        self.op = np.array([OPS.index(r["op"]) for r in rules], dtype=np.int8)
+        self.debounce = np.array([r["debounce"] for r in rules])
+        self.state_size = len(SCALAR_METRICS) + len(self.strikes)
+
+        # per-rule memory survives recompiles for rules that keep their id
+        self.last_fired = np.full(n, -np.inf)
+        self.prev_diff = np.full(n, np.nan)
+        self.prev_lhs = np.full(n, np.nan)
+        self.prev_level = np.zeros(n, dtype=bool)
+        if previous is not None:
+            old = {r["id"]: i for i, r in enumerate(previous.rules)}
+            for i, r in enumerate(rules):
+                j = old.get(r["id"])
+                if j is not None:
+                    self.last_fired[i] = previous.last_fired[j]
+                    self.prev_diff[i] = previous.prev_diff[j]
+                    self.prev_lhs[i] = previous.prev_lhs[j]
+                    self.prev_level[i] = previous.prev_level[j]
+
+    def evaluate(self, state: np.ndarray, now: float, fresh: np.ndarray = None) -> np.ndarray:
+        """
+        fresh: per-slot mask of values that were re-sampled in this update. Rules
+        reading only stale slots are skipped and keep their previous state.
+        """
+        if fresh is None:
+            active = np.ones(len(self.rules), dtype=bool)
+        else:
+            active = fresh[self.lhs] | ((self.rhs >= 0) & fresh[np.maximum(self.rhs, 0)])
+        lhs = state[self.lhs]
+        rhs = np.where(self.rhs >= 0, state[np.maximum(self.rhs, 0)], self.const)
+        diff = lhs - rhs
+        prev = self.prev_diff
+        op = self.op
+
+        with np.errstate(invalid="ignore"):
+            level = np.select(
+                [op == GT, op == LT, op == GE, op == LE],
+                [diff > 0, diff < 0, diff >= 0, diff <= 0],
+                default=False,
+            )
+            rising = level & ~self.prev_level
+            hit = np.select(
+                [op <= LE,
+                 op == CROSS_ABOVE, op == CROSS_BELOW, op == CROSS, op == CHANGED],
+                [rising,
+                 (prev <= 0) & (diff > 0),
+                 (prev >= 0) & (diff < 0),
+                 ((prev <= 0) & (diff > 0)) | ((prev >= 0) & (diff < 0)),
+                 (lhs != self.prev_lhs) & ~np.isnan(self.prev_lhs) & ~np.isnan(lhs)],
+                default=False,
+            )
+        hit &= active & ((now - self.last_fired) >= self.debounce)
+
+        # keep the last observed value where this update had none (e.g. no zero-gamma)
+        seen = active & ~np.isnan(diff)
+        self.prev_level = np.where(seen, level, self.prev_level)
+        self.prev_diff = np.where(seen, diff, prev)
+        self.prev_lhs = np.where(active & ~np.isnan(lhs), lhs, self.prev_lhs)
+        fired = np.flatnonzero(hit)
+        self.last_fired[fired] = now
+        return fired
+
+
+# ── sinks ───────────────────────────────────────────────────────────────────────────
+class LogSink:
+    def emit(self, alert: dict):
+        print(f"[ALERT] {alert['symbol'] or '*'} {alert['message']}")
+
+
+class WebhookSink:
+    """
+    POSTs each alert as JSON to a (local) URL from a background thread, so slow or
+    unreachable receivers never block the WebSocket loop.
+    """
+
+    _STOP = object()
+
+    def __init__(self, url: str, timeout: float = 2.0, max_pending: int = 1000):
+        self.url = validate_webhook_url(url)
+        self.timeout = timeout
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+
+    def emit(self, alert: dict):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="alert-webhook", daemon=True)
+            self._thread.start()
+        try:
+            self._queue.put_nowait(alert)
+        except queue.Full:
+            print(f"[ALERT] Webhook queue full, dropping {alert['rule_id']}")
+
+    def close(self):
+        """
+        Stops the delivery thread after it finishes the alert in flight; pending
+        alerts are discarded.
+        """
+        if self._thread is None:
+            return
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self._queue.put(self._STOP)
+        self._thread = None
+
+    def _run(self):
+        while True:
+            alert = self._queue.get()
+            if alert is self._STOP:
+                return
+            req = urllib.request.Request(
+                self.url, data=json.dumps(alert).encode("utf-8"),
+                headers={"Content-Type": "application/json"}, method="POST",
+            )
+            try:
+                urllib.request.urlopen(req, timeout=self.timeout).close()
+            except Exception as e:
+                print(f"[ALERT] Webhook {self.url} failed: {e}")
+
+
+class StreamSink:
+    """
+    Fan-out to push-stream subscribers (one asyncio.Queue each). Slow subscribers
+    drop alerts rather than applying back-pressure to the evaluator.
+    """
+
+    def __init__(self, max_pending: int = 1000):
+        self.max_pending = max_pending
+        self._subscribers = set()
+
+    def subscribe(self) -> asyncio.Queue:
+        q = asyncio.Queue(maxsize=self.max_pending)
+        self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q: asyncio.Queue):
+        self._subscribers.discard(q)
+
+    def emit(self, alert: dict):
+        for q in list(self._subscribers):
+            try:
+                q.put_nowait(alert)
+            except asyncio.QueueFull:
+                pass
+
+
+# ── engine ──────────────────────────────────────────────────────────────────────────
+class AlertEngine:
+    def __init__(self, history: int = 500):
+        self._rules = {}
+        self._compiled = {}  # symbol -> _CompiledRules
+        self._stale = {}     # previous compilations, to carry per-rule state over
+        self.sinks = {"log": LogSink(), "stream": StreamSink()}
+        self.recent = deque(maxlen=history)
+
+    # rules
+    def rules(self) -> list:
+        return list(self._rules.values())
+
+    def add_rules(self, rules: list) -> list:
+        rules = [validate_rule(r) for r in rules]
+        for r in rules:
+            missing = [s for s in r["sinks"] if s not in self.sinks]
+            if missing:
+                raise ValueError(f"Rule {r['id']}: unknown sinks {missing}.")
+        for r in rules:
+            self._rules[r["id"]] = r
+        self._invalidate()
+        return rules
+
+    def remove_rule(self, rule_id: str) -> bool:
+        removed = self._rules.pop(rule_id, None) is not None
+        if removed:
+            self._invalidate()
+        return removed
+
+    def add_webhook(self, name: str, url: str):
+        """
+        Registers (or replaces) a named local webhook sink; raises ValueError for
+        reserved names or non-loopback URLs.
+        """
+        if not name or name in BUILTIN_SINKS:
+            raise ValueError(f"Webhook needs a name other than {list(BUILTIN_SINKS)}.")
+        sink = WebhookSink(url)
+        old = self.sinks.get(name)
+        self.sinks[name] = sink
+        if isinstance(old, WebhookSink):
+            old.close()
+
+    def _invalidate(self):
+        # recompiled lazily per symbol on the next evaluation
+        self._stale.update(self._compiled)
+        self._compiled = {}
+
+    def _compiled_for(self, symbol: str) -> _CompiledRules:
+        compiled = self._compiled.get(symbol)
+        if compiled is None:
+            rules = [r for r in self._rules.values() if r["symbol"] in (None, symbol)]
+            previous = self._stale.pop(symbol, None)
+            compiled = self._compiled[symbol] = _CompiledRules(rules, previous)
+        return compiled
+
+    # evaluation
+    def evaluate(self, symbol: str, metrics: dict, oi_change=None, chain_version: int = 0,
+                 now: float = None, changed=None) -> list:
+        """
+        metrics: scalar values by SCALAR_METRICS name (sentiment may be its label).
+        oi_change: callable strike -> OI change versus open (or None if unknown).
+        changed: names (incl. "oi_change") re-sampled in this update; rules that
+        only read other metrics are not evaluated. None means everything changed.
+        Returns the fired alerts after dispatching them to their sinks.
+        """
+        compiled = self._compiled_for(symbol)
+        if not compiled.rules:
+            return []
+        now = time.time() if now is None else now
+
+        state = np.full(compiled.state_size, np.nan)
+        for i, name in enumerate(SCALAR_METRICS):
+            x = metrics.get(name)
+            if name == "sentiment" and isinstance(x, str):
+                x = SENTIMENT_SCORES.get(x)
+            if x is not None:
+                state[i] = float(x)
+        if oi_change is not None:
+            for i, k in enumerate(compiled.strikes):
+                x = oi_change(k)
+                if x is not None:
+                    state[len(SCALAR_METRICS) + i] = x
+
+        fresh = None
+        if changed is not None:
+            fresh = np.zeros(compiled.state_size, dtype=bool)
+            for i, name in enumerate(SCALAR_METRICS):
+                fresh[i] = name in changed
+            fresh[len(SCALAR_METRICS):] = "oi_change" in changed
+
+        fired = compiled.evaluate(state, now, fresh)
+        alerts = []
+        for i in fired.tolist():
+            rule = compiled.rules[i]
+            observed = state[compiled.lhs[i]]
+            reference = state[compiled.rhs[i]] if compiled.rhs[i] >= 0 else compiled.const[i]
+            target = f"{rule['metric']}@{rule['strike']}" if rule["metric"] == "oi_change" else rule["metric"]
+            alert = {
+                "rule_id": rule["id"],
+                "symbol": symbol,
+                "metric": rule["metric"],
+                "strike": rule.get("strike"),
+                "op": rule["op"],
+                "value": rule["value"],
+                "observed": float(observed),
+                "reference": float(reference) if math.isfinite(reference) else None,
+                "time": now,
+                "chain_version": chain_version,
+                "message": (
+                    f"{rule['id']}: {target} changed (now {observed:,.2f})" if rule["op"] == "changed" else
+                    f"{rule['id']}: {target} {rule['op']} {rule['value']} (now {observed:,.2f})"
+                ),
+            }
+            alerts.append(alert)
+            self.recent.append(alert)
+            for name in rule["sinks"]:
+                sink = self.sinks.get(name)
+                if sink is not None:
+                    sink.emit(alert)
+        return alerts
+
+
+alert_engine = AlertEngine()
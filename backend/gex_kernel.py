@@ -0,0 +1,174 @@
+import math
+import numpy as np
+
+# ------------------------------------------------------------------------------------
+# Fused per-row kernel behind gex_logic.compute_metrics.
+#
+# All outputs are written into one preallocated (N_OUTPUTS, n) float64 block in a
+# single pass, instead of pandas allocating a temporary per derived column plus two
+# groupby(...).cumsum() passes. Numba is used when installed; otherwise an
+# equivalent pure-NumPy path (ufuncs with out=) is used.
+# ------------------------------------------------------------------------------------
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:  # pragma: no cover - depends on the environment
+    HAVE_NUMBA = False
+
+# Row order of the output block; also the column names compute_metrics adds.
+OUTPUT_COLUMNS = (
+    "d1",
+    "Vega",
+    "Vanna",
+    "Dealer OI",
+    "Dealer Delta Exposure",
+    "Dealer Vanna Exposure",
+    "GEX",
+    "GEX_1pct",
+    "Cumulative GEX",
+    "Cumulative Dealer Delta",
+    "VegaTheta_Ratio",
+)
+N_OUTPUTS = len(OUTPUT_COLUMNS)
+(D1, VEGA, VANNA, DEALER_OI, DEALER_DELTA, DEALER_VANNA,
+ GEX, GEX_1PCT, CUM_GEX, CUM_DEALER_DELTA, VTR) = range(N_OUTPUTS)
+
+GEX_1PCT_SCALE = 0.0201
+INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+
+
+def _metrics_loop(strike, oi, delta, gamma, theta, group, n_groups,
+                  spot, contract_size, vol, T, out):
+    """
+    Scalar reference loop; compiled with Numba when available. Cumulative sums
+    follow pandas groupby().cumsum() semantics: running totals per group in row
+    order, NaN inputs yield NaN and are skipped.
+    """
+    n = strike.shape[0]
+    sqrt_T = math.sqrt(T)
+    vol_sqrt_T = vol * sqrt_T
+    half_var_T = 0.5 * vol * vol * T
+    vega_scale = spot * sqrt_T * INV_SQRT_2PI
+    spot_vol = spot * vol
+    gex_scale = contract_size * spot * spot
+
+    cum_gex = np.zeros(n_groups)
+    cum_delta = np.zeros(n_groups)
+
+    for i in range(n):
+        d1 = (math.log(spot / strike[i]) + half_var_T) / vol_sqrt_T
+        vega = vega_scale * math.exp(-0.5 * d1 * d1)
+        vanna = -d1 * vega / spot_vol
+        dealer_oi = oi[i] * contract_size
+        dealer_delta = dealer_oi * delta[i]
+        gex = oi[i] * gamma[i] * gex_scale
+
+        out[D1, i] = d1
+        out[VEGA, i] = vega
+        out[VANNA, i] = vanna
+        out[DEALER_OI, i] = dealer_oi
+        out[DEALER_DELTA, i] = dealer_delta
+        out[DEALER_VANNA, i] = dealer_oi * vanna
+        out[GEX, i] = gex
+        out[GEX_1PCT, i] = gex * GEX_1PCT_SCALE
+
+        g = group[i]
+        if g < 0:
+            # missing OptionType: pandas leaves these rows NaN
+            out[CUM_GEX, i] = np.nan
+            out[CUM_DEALER_DELTA, i] = np.nan
+        else:
+            if math.isnan(gex):
+                out[CUM_GEX, i] = np.nan
+            else:
+                cum_gex[g] += gex
+                out[CUM_GEX, i] = cum_gex[g]
+            if math.isnan(dealer_delta):
+                out[CUM_DEALER_DELTA, i] = np.nan
+            else:
+                cum_delta[g] += dealer_delta
+                out[CUM_DEALER_DELTA, i] = cum_delta[g]
+
+        th = theta[i]
+        out[VTR, i] = vega / abs(th) if th != 0 else np.nan
+
+
+def _metrics_numpy(strike, oi, delta, gamma, theta, group, n_groups,
+                   spot, contract_size, vol, T, out):
+    """
+    Pure-NumPy fallback: every intermediate lands in a row of `out`, so the only
+    extra allocations are the per-group masks for the cumulative sums.
+    """
+    sqrt_T = np.sqrt(T)
+    d1, vega, vanna = out[D1], out[VEGA], out[VANNA]
+
+    np.divide(spot, strike, out=d1)
+    np.log(d1, out=d1)
+    d1 += 0.5 * vol ** 2 * T
+    d1 /= vol * sqrt_T
+
+    np.square(d1, out=vega)
+    vega *= -0.5
+    np.exp(vega, out=vega)
+    vega *= spot * sqrt_T * INV_SQRT_2PI
+
+    np.multiply(d1, vega, out=vanna)
+    vanna /= -(spot * vol)
+
+    np.multiply(oi, contract_size, out=out[DEALER_OI])
+    np.multiply(out[DEALER_OI], delta, out=out[DEALER_DELTA])
+    np.multiply(out[DEALER_OI], vanna, out=out[DEALER_VANNA])
+
+    np.multiply(oi, gamma, out=out[GEX])
+    out[GEX] *= contract_size * spot ** 2
+    np.multiply(out[GEX], GEX_1PCT_SCALE, out=out[GEX_1PCT])
+
+    out[CUM_GEX] = np.nan
+    out[CUM_DEALER_DELTA] = np.nan
+    for g in range(n_groups):
+        mask = group == g
+        for src, dst in ((GEX, CUM_GEX), (DEALER_DELTA, CUM_DEALER_DELTA)):
+            vals = out[src, mask]
+            cum = np.nancumsum(vals)
+            cum[np.isnan(vals)] = np.nan
+            out[dst, mask] = cum
+
+    abs_theta = np.abs(theta)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(vega, abs_theta, out=out[VTR])
+    out[VTR, abs_theta == 0] = np.nan
+
+
+if HAVE_NUMBA:
+    _metrics_kernel = njit(cache=True, nogil=True, error_model="numpy")(_metrics_loop)
+else:
+    _metrics_kernel = _metrics_numpy
+
+
+def _as_f64(a):
+    return np.ascontiguousarray(a, dtype=np.float64)
+
+
+def compute_metrics_arrays(strike, oi, delta, gamma, theta, group, n_groups,
+                           spot_price, contract_size=75, vol=0.2, T=0.25, out=None):
+    """
+    Computes every compute_metrics column for one chain in a single pass.
+
+    `group` holds integer option-type codes in [0, n_groups) (-1 for missing), as
+    returned by pd.factorize. Returns the (N_OUTPUTS, n) block, row order given
+    by OUTPUT_COLUMNS; pass `out` to reuse a buffer across calls.
+    """
+    strike = _as_f64(strike)
+    n = strike.shape[0]
+    if out is None:
+        out = np.empty((N_OUTPUTS, n), dtype=np.float64)
+    elif out.shape != (N_OUTPUTS, n):
+        raise ValueError(f"out must have shape {(N_OUTPUTS, n)}, got {out.shape}")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        _metrics_kernel(
+            strike, _as_f64(oi), _as_f64(delta), _as_f64(gamma), _as_f64(theta),
+            np.ascontiguousarray(group, dtype=np.int64), int(n_groups),
+            float(spot_price), float(contract_size), float(vol), float(T), out,
+        )
+    return out
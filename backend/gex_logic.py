@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 
+from gex_kernel import OUTPUT_COLUMNS, compute_metrics_arrays
+
 def auto_rename_put_columns(df, strike_col="Strike Price"):
     if strike_col not in df.columns:
         raise ValueError(f"Column '{strike_col}' not found in the DataFrame.")
@@ -108,21 +110,21 @@ def filter_strikes_around_spot(df, spot_price, n=15, step=50):
 
 
 def compute_metrics(df, spot_price, contract_size=75, vol=0.2, T=0.25):
-    df["d1"] = np.log(spot_price / df["Strike Price"]) + 0.5 * vol ** 2 * T
-    df["d1"] = df["d1"] / (vol * np.sqrt(T))
-    df["Vega"] = spot_price * np.sqrt(T) * (1 / np.sqrt(2 * np.pi)) * np.exp(-0.5 * df["d1"] ** 2)
-    df["Vanna"] = - df["d1"] * df["Vega"] / (spot_price * vol)
-
-    df["Dealer OI"] = df["OI"] * contract_size
-    df["Dealer Delta Exposure"] = df["Dealer OI"] * df["Delta"]
-    df["Dealer Vanna Exposure"] = df["Dealer OI"] * df["Vanna"]
-    df["GEX"] = df["OI"] * contract_size * df["Gamma"] * (spot_price ** 2)
-    df["GEX_1pct"] = df["GEX"] * 0.0201
-    df["Cumulative GEX"] = df.groupby("OptionType")["GEX"].cumsum()
-    df["Cumulative Dealer Delta"] = df.groupby("OptionType")["Dealer Delta Exposure"].cumsum()
-    df["VegaTheta_Ratio"] = np.where(df["Theta"] != 0, df["Vega"] / np.abs(df["Theta"]), np.nan)
-
-    return df
+    """
+    Thin wrapper over gex_kernel.compute_metrics_arrays: all derived columns are
+    computed in one pass into a single preallocated block, which becomes one 2-D
+    block of the returned frame as is. The input (often a filtered slice) is left
+    untouched and its columns are shared, not copied.
+    """
+    group, labels = pd.factorize(df["OptionType"])
+    block = compute_metrics_arrays(
+        df["Strike Price"].to_numpy(), df["OI"].to_numpy(), df["Delta"].to_numpy(),
+        df["Gamma"].to_numpy(), df["Theta"].to_numpy(), group, len(labels),
+        spot_price, contract_size, vol, T,
+    )
+    outputs = pd.DataFrame(block.T, index=df.index, columns=list(OUTPUT_COLUMNS), copy=False)
+    inputs = df[[c for c in df.columns if c not in OUTPUT_COLUMNS]]
+    return pd.concat([inputs, outputs], axis=1)
 
 def separate_calls_puts(df):
     return df[df["OptionType"] == "C"], df[df["OptionType"] == "P"]
@@ -159,33 +161,13 @@ def summarize(calls_df, puts_df):
 def compress(df, col):
     return df.groupby("Strike Price")[col].sum().reset_index()
 
-def format_output_series(df_calc, merged, calls_df, puts_df, zero_gamma_level, spot):
-    def safe_float(x): return float(x) if pd.notna(x) else 0.0
-    def safe_int(x): return int(float(x)) if pd.notna(x) else 0
-
-    def make_series(df, col):
-        return [
-            {"strike": safe_int(r["Strike Price"]), "value": safe_float(r[col])}
-            for _, r in compress(df, col).iterrows()
-        ]
-    # ── Separate Dealer Vanna for Calls vs Puts ─────────────────────
-    def make_series_df(df, col):
-        return [
-            {"strike": int(r["Strike Price"]), "value": float(r[col])}
-            for _, r in df.groupby("Strike Price")[col].sum().reset_index().iterrows()
-        ]
-
-    net_gex_1pct = [
-        {"strike": safe_int(r["Strike Price"]), "value": safe_float(r["Net GEX 1pct"])}
-        for _, r in merged.iterrows()
-    ]
-    total_net_gamma = sum([d["value"] for d in net_gex_1pct])
+def classify_sentiment(calls_df, puts_df):
     avg_vtr_calls = calls_df["VegaTheta_Ratio"].mean() or 0.0
     avg_vtr_puts = puts_df["VegaTheta_Ratio"].mean() or 0.0
     diff = avg_vtr_calls - avg_vtr_puts
     tol, high = 0.15, 0.3
 
-    sentiment = (
+    return (
         "Sideways" if abs(diff) < tol else
         "Bullish" if diff >= high else
         "Mildly Bullish" if diff >= tol else
@@ -193,14 +175,7 @@ def format_output_series(df_calc, merged, calls_df, puts_df, zero_gamma_level, s
         "Mildly Bearish" if diff <= -tol else "Neutral"
     )
 
-    summary = (
-        f"Calls GEX: {calls_df['GEX'].sum():.2e}\n"
-        f"Puts GEX: {puts_df['GEX'].sum():.2e}\n"
-        f"Zero Gamma Level: {zero_gamma_level:.2f}\n"
-        f"Net GEX (scaled 1e11): {total_net_gamma / 1e11:.2f}\n"
-        f"Sentiment: {sentiment}"
-    )
-
+def find_gamma_wall(df_calc):
     gamma_exposures = (
         df_calc
         .assign(gammaExposure=lambda d: d["Gamma"] * d["OI"])
@@ -209,20 +184,181 @@ def format_output_series(df_calc, merged, calls_df, puts_df, zero_gamma_level, s
         .reset_index()
     )
     # pick strike with max |exposure|
-    gamma_wall_strike = int(
+    return int(
         gamma_exposures.iloc[gamma_exposures["gammaExposure"].abs().idxmax()]["Strike Price"]
     )
+
+def _strike_series(df, col):
+    """
+    (strikes, values) summed per strike, as float arrays; NaN / ±inf sums become 0.
+    """
+    g = df.groupby("Strike Price")[col].sum()
+    return g.index.to_numpy(dtype=float), np.nan_to_num(g.to_numpy(dtype=float), posinf=0.0, neginf=0.0)
+
+# strikes kept exact on either side of each chart anchor (spot, zero gamma, gamma wall)
+PROTECTED_KEEP = 2
+N_ANCHORS = 3
+
+def _protected_mask(strikes, anchors, keep=PROTECTED_KEEP):
+    """
+    Marks the `keep` strikes on either side of each anchor (spot, zero-gamma level,
+    gamma wall); these always stay at full resolution.
+    """
+    mask = np.zeros(len(strikes), dtype=bool)
+    for a in anchors:
+        if a is None or not np.isfinite(a):
+            continue
+        i = int(np.searchsorted(strikes, a))
+        mask[max(i - keep, 0):i + keep] = True
+    return mask
+
+def _bucket_sums(strikes, values, protected, width):
+    """
+    Sums runs of up to `width` consecutive unprotected strikes into one point.
+    Buckets never span a protected strike. Returns (strike, value, lo, hi) arrays.
+    """
+    free = ~protected
+    rank = np.cumsum(free) - 1                  # position among unprotected strikes
+    segment = np.cumsum(protected)              # changes at every protected strike
+    key = np.where(free, rank // width, -1)
+    start = np.ones(len(strikes), dtype=bool)
+    start[1:] = protected[1:] | protected[:-1] | (key[1:] != key[:-1]) | (segment[1:] != segment[:-1])
+    idx = np.flatnonzero(start)
+
+    sums = np.add.reduceat(values, idx)
+    counts = np.diff(np.append(idx, len(strikes)))
+    lo = strikes[idx]
+    hi = strikes[idx + counts - 1]
+    centre = np.add.reduceat(strikes, idx) / counts
+    return centre, sums, lo, hi
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: indices of n_out points that best preserve the
+    visual shape of (x, y). First and last points are always kept.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n) if n_out >= n else np.array([0, n - 1][:max(n_out, 1)])
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        nxt_lo, nxt_hi = hi, (edges[b + 2] if b + 2 < len(edges) else n)
+        avg_x, avg_y = x[nxt_lo:nxt_hi].mean(), y[nxt_lo:nxt_hi].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        out[b + 1] = a
+    return out
+
+# smallest max_points that can be honoured: every protected strike, at least one
+# bucket in each of the (up to N_ANCHORS + 1) free runs between them, plus one
+MIN_MAX_POINTS = 2 * PROTECTED_KEEP * N_ANCHORS + (N_ANCHORS + 1) + 1
+
+def downsample_series(strikes, values, how, protected, max_points=None, bucket=None):
+    """
+    Bounds one chart series to at most max_points points (or aggregates every
+    `bucket` strikes). how="sum" adds exposures within a bucket; how="lttb" keeps
+    representative points of ratio / cumulative curves. Protected strikes are
+    always emitted exactly.
+    """
+    if max_points is not None and max_points < MIN_MAX_POINTS:
+        raise ValueError(f"max_points must be at least {MIN_MAX_POINTS}.")
+    if bucket is not None and bucket < 1:
+        raise ValueError("bucket must be a positive number of strikes.")
+    n = len(strikes)
+    if (max_points is None or n <= max_points) and not bucket:
+        return [{"strike": int(k), "value": float(v)} for k, v in zip(strikes, values)]
+
+    n_protected = int(protected.sum())
+    if how == "sum":
+        if bucket:
+            width = int(bucket)
+        else:
+            free_runs = int(np.count_nonzero(~protected[1:] & protected[:-1]) + (not protected[0]))
+            budget = max(max_points - n_protected - free_runs, 1)
+            width = int(np.ceil((n - n_protected) / budget))
+        centre, sums, lo, hi = _bucket_sums(strikes, values, protected, max(width, 1))
+        return [
+            {"strike": int(round(c)), "value": float(v)} if a == b else
+            {"strike": int(round(c)), "value": float(v), "from": int(a), "to": int(b)}
+            for c, v, a, b in zip(centre, sums, lo, hi)
+        ]
+
+    n_out = int(np.ceil(n / bucket)) if bucket else max_points - n_protected
+    keep = np.union1d(lttb_indices(strikes, values, max(n_out, 2)), np.flatnonzero(protected))
+    return [{"strike": int(strikes[i]), "value": float(values[i])} for i in keep]
+
+def format_output_series(df_calc, merged, calls_df, puts_df, zero_gamma_level, spot,
+                         max_points=None, bucket=None):
+    """
+    Chart payload for one chain. With max_points / bucket, wide chains are reduced
+    server-side (see downsample_series), keeping strikes near spot, the zero-gamma
+    level and the gamma wall exact; summary figures always use full resolution.
+    """
+    gamma_wall_strike = find_gamma_wall(df_calc)
+    merged_strikes = merged["Strike Price"].to_numpy(dtype=float)
+    merged_values = np.nan_to_num(merged["Net GEX 1pct"].to_numpy(dtype=float), posinf=0.0, neginf=0.0)
+    anchors = (spot, zero_gamma_level, gamma_wall_strike)
+
+    def series(strikes, values, how="sum"):
+        protected = _protected_mask(strikes, anchors)
+        return downsample_series(strikes, values, how, protected, max_points, bucket)
+
+    total_net_gamma = float(merged_values.sum())
+    sentiment = classify_sentiment(calls_df, puts_df)
+
+    # no sign change in net GEX across the window -> no zero-gamma level
+    zero_gamma_text = "n/a" if zero_gamma_level is None else f"{zero_gamma_level:.2f}"
+    summary = (
+        f"Calls GEX: {calls_df['GEX'].sum():.2e}\n"
+        f"Puts GEX: {puts_df['GEX'].sum():.2e}\n"
+        f"Zero Gamma Level: {zero_gamma_text}\n"
+        f"Net GEX (scaled 1e11): {total_net_gamma / 1e11:.2f}\n"
+        f"Sentiment: {sentiment}"
+    )
+
     return {
-        "net_gex_1pct": net_gex_1pct,
-        "dealer_delta": make_series(df_calc, "Dealer Delta Exposure"),
-        # "dealer_vanna": make_series(df_calc, "Dealer Vanna Exposure"),
-        "dealer_vanna_calls": make_series_df(calls_df, "Dealer Vanna Exposure"),
-        "dealer_vanna_puts":  make_series_df(puts_df,  "Dealer Vanna Exposure"),
-        "gex": make_series(df_calc, "GEX"),
-        "cumulative_gex": make_series(df_calc, "Cumulative GEX"),
-        "vega_theta_ratio": make_series(df_calc, "VegaTheta_Ratio"),
+        "net_gex_1pct": series(merged_strikes, merged_values),
+        "dealer_delta": series(*_strike_series(df_calc, "Dealer Delta Exposure")),
+        # "dealer_vanna": series(*_strike_series(df_calc, "Dealer Vanna Exposure")),
+        # ── Separate Dealer Vanna for Calls vs Puts ─────────────────────
+        "dealer_vanna_calls": series(*_strike_series(calls_df, "Dealer Vanna Exposure")),
+        "dealer_vanna_puts":  series(*_strike_series(puts_df,  "Dealer Vanna Exposure")),
+        "gex": series(*_strike_series(df_calc, "GEX")),
+        "cumulative_gex": series(*_strike_series(df_calc, "Cumulative GEX"), how="lttb"),
+        "vega_theta_ratio": series(*_strike_series(df_calc, "VegaTheta_Ratio"), how="lttb"),
         "summary_text": summary,
         "sentiment": sentiment,
         "spot": spot,
         "gamma_wall_strike": gamma_wall_strike,
     }
+
+def process_all(df, spot_price, n=15, contract_size=75, vol=0.2, T=0.25, max_points=None, bucket=None):
+    """
+    Full /compute pipeline on a long call/put frame (see chain_schema.read_option_chain).
+    The contract step is inferred from the strike grid and the window is centred on
+    the strike nearest to spot.
+    """
+    strikes = np.unique(df["Strike Price"].to_numpy(dtype=float))
+    gaps = np.diff(strikes)
+    gaps = gaps[gaps > 0]
+    step = float(gaps.min()) if len(gaps) else 50.0
+    # filter_strikes_around_spot walks an integer strike grid
+    if step < 1 or not np.isclose(step, round(step)):
+        raise ValueError(f"Unsupported strike step {step:g}: strikes must lie on a whole-number grid.")
+    step = int(round(step))
+    center = int(round(spot_price / step) * step)
+
+    df_sel = filter_strikes_around_spot(df, center, n=n, step=step)
+    df_calc = compute_metrics(df_sel, spot_price, contract_size, vol, T)
+    calls_df, puts_df = separate_calls_puts(df_calc)
+    merged, zero_gamma_level = calculate_zero_gamma_level(calls_df, puts_df)
+    return format_output_series(
+        df_calc, merged, calls_df, puts_df, zero_gamma_level, spot_price, max_points, bucket
+    )
@@ -15,6 +15,17 @@ GFDL_ACCESS_KEY   = "770de4e9-955c-42a0-820a-b3097535112c"
 # ------------------------------------------------------------------------------------
 live_ticks_cache: list = []
 
+# Latest quote per option from RealtimeOptionChainResult: {instrument: {LTP, Volume, OpenInterest}}
+live_quotes: dict = {}
+
+# Bumped once per processed chain message; listeners are called with the latest version
+# (see add_chain_update_listener) so analytics run per chain update, not per poll.
+chain_version = 0
+_chain_update_listeners: list = []
+_chain_update_pending = False
+_tick_listeners: list = []
+_spot_listeners: list = []
+
 # We'll suppress the flood of "Echo" logs by only printing them once every 10 seconds:
 _last_echo_print = 0
 
@@ -29,11 +40,13 @@ async def _ws_consumer(
     """
     1) Authenticate to GFDL.
     2) Fetch the Futures price (“<symbol>-I”), round to nearest contract_step.
-    3) SubscribeOptionChain + SubscribeOptionChainGreeks (both Depth=strike_range).
+    3) SubscribeOptionChain + SubscribeOptionChainGreeks (both Depth=strike_range),
+       plus SubscribeRealtime on the futures for live spot.
     4) One‐off GetLastQuoteOptionGreeksChain for a snapshot.
     5) Listen for incoming messages of types:
        • Echo
-       • RealtimeOptionChainResult
+       • RealtimeOptionChainResult  (per-option LTP / volume → live_quotes)
+       • RealtimeResult             (futures LTP → shared_state.live_spot)
        • RealtimeOptionChainGreeksResult
        • LastQuoteOptionGreeksChainResult
        • OptionGreeksChainWithQuoteResult
@@ -127,6 +140,7 @@ async def _ws_consumer(
             # ────────────────────────────────────────────────────────────────────────
             # Store the official “center spot” so main.py’s /live_data use it
             shared_state.live_center_spot = rounded_spot
+            shared_state.live_spot = float(chosen_spot)
             # ────────────────────────────────────────────────────────────────────────
 
             # ────────────────────────────────────────────────────────────────────────
@@ -161,7 +175,18 @@ async def _ws_consumer(
             print(f"[WS] Sent subscription (OptionChainGreeks) → {sub_chain_greeks_payload}")
             await asyncio.sleep(0.2)
 
-            # 3) One‐off snapshot: GetLastQuoteOptionGreeksChain
+            # 3) SubscribeRealtime on the futures, so spot follows the market
+            sub_fut_payload = {
+                "MessageType":          "SubscribeRealtime",
+                "Exchange":             "NFO",
+                "InstrumentIdentifier": fut_inst,
+                "Unsubscribe":          "false"
+            }
+            await ws.send(json.dumps(sub_fut_payload))
+            print(f"[WS] Sent subscription (Realtime futures) → {sub_fut_payload}")
+            await asyncio.sleep(0.2)
+
+            # 4) One‐off snapshot: GetLastQuoteOptionGreeksChain
             one_off_payload = {
                 "MessageType": "GetLastQuoteOptionGreeksChain",
                 "Exchange":    "NFO",
@@ -176,6 +201,7 @@ async def _ws_consumer(
             # D) LISTEN FOREVER for:
             #     • Echo
             #     • RealtimeOptionChainResult
+            #     • RealtimeResult (futures)
             #     • RealtimeOptionChainGreeksResult
             #     • LastQuoteOptionGreeksChainResult
             #     • OptionGreeksChainWithQuoteResult
@@ -196,7 +222,13 @@ async def _ws_consumer(
 
                 if msg_type == "RealtimeOptionChainResult":
                     entries = _extract_first_list(data)
-                    print(f"[WS] RealtimeOptionChainResult with {len(entries)} entries")
+                    for quote in entries:
+                        _fold_option_quote(quote)
+                    continue
+
+                if msg_type == "RealtimeResult":
+                    if data.get("InstrumentIdentifier") == fut_inst:
+                        _update_spot(data.get("LastTradePrice"))
                     continue
 
                 if msg_type == "RealtimeOptionChainGreeksResult":
@@ -207,6 +239,7 @@ async def _ws_consumer(
                     # Prevent unbounded growth: keep only most recent 5000 ticks
                     if len(live_ticks_cache) > 5000:
                         live_ticks_cache[:] = live_ticks_cache[-5000:]
+                    _notify_chain_update()
                     continue
 
                 if msg_type in ("LastQuoteOptionGreeksChainResult", "OptionGreeksChainWithQuoteResult"):
@@ -216,6 +249,7 @@ async def _ws_consumer(
                         _append_parsed_tick(tick, strike_regex)
                     if len(live_ticks_cache) > 5000:
                         live_ticks_cache[:] = live_ticks_cache[-5000:]
+                    _notify_chain_update()
                     continue
 
                 if msg_type == "RequestError":
@@ -240,6 +274,39 @@ def _extract_first_list(payload: dict) -> list:
     return []
 
 
+def _fold_option_quote(quote: dict):
+    """
+    Keeps the latest LTP / traded volume / OI per option instrument.
+    """
+    instr = quote.get("InstrumentIdentifier", "")
+    if not instr:
+        return
+    live_quotes[instr] = {
+        "LTP":          quote.get("LastTradePrice", 0) or 0.0,
+        "Volume":       quote.get("TotalQtyTraded", quote.get("Volume", 0)) or 0,
+        "OpenInterest": quote.get("OpenInterest", 0) or 0,
+    }
+
+
+def _update_spot(ltp):
+    """
+    Futures tick: moves shared_state.live_spot and notifies spot listeners
+    (which rescale cached spot-dependent totals instead of rebuilding the chain).
+    """
+    try:
+        spot = float(ltp)
+    except (TypeError, ValueError):
+        return
+    if spot <= 0 or spot == shared_state.live_spot:
+        return
+    shared_state.live_spot = spot
+    for callback in _spot_listeners:
+        try:
+            callback(spot)
+        except Exception as e:
+            print(f"[WS] Spot listener {getattr(callback, '__name__', callback)} failed: {e}")
+
+
 def _append_parsed_tick(tick: dict, strike_regex: re.Pattern):
     """
     From a single tick dict (which may contain keys like "InstrumentIdentifier",
@@ -260,6 +327,63 @@ def _append_parsed_tick(tick: dict, strike_regex: re.Pattern):
         "Theta":                tick.get("Theta", 0) or 0.0,
     }
     live_ticks_cache.append(parsed_tick)
+    # First fresh tick after a warm start: the data is no longer stale
+    shared_state.live_restored_at = None
+    for callback in _tick_listeners:
+        try:
+            callback(parsed_tick)
+        except Exception as e:
+            print(f"[WS] Tick listener {getattr(callback, '__name__', callback)} failed: {e}")
+
+
+def add_chain_update_listener(callback):
+    """
+    Registers callback(version) to run after chain messages have been folded into
+    live_ticks_cache. Calls are scheduled on the event loop, so a burst of messages
+    read in one loop iteration triggers a single call with the latest version.
+    """
+    _chain_update_listeners.append(callback)
+
+
+def add_tick_listener(callback):
+    """
+    Registers callback(parsed_tick) to run for every tick appended to
+    live_ticks_cache. Keep these O(1): they run inline in the receive loop.
+    """
+    _tick_listeners.append(callback)
+
+
+def add_spot_listener(callback):
+    """
+    Registers callback(spot) to run whenever the futures LTP changes.
+    """
+    _spot_listeners.append(callback)
+
+
+def _notify_chain_update():
+    global chain_version, _chain_update_pending
+    chain_version += 1
+    if _chain_update_pending:
+        return
+    _chain_update_pending = True
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _run_chain_update_listeners()
+        return
+    # not inline: the receive loop keeps draining messages and listeners run once
+    loop.call_soon(_run_chain_update_listeners)
+
+
+def _run_chain_update_listeners():
+    global _chain_update_pending
+    _chain_update_pending = False
+    version = chain_version
+    for callback in _chain_update_listeners:
+        try:
+            callback(version)
+        except Exception as e:
+            print(f"[WS] Chain update listener {getattr(callback, '__name__', callback)} failed: {e}")
 
 
 def start_background_ws_loop(
@@ -282,5 +406,7 @@ def clear_live_cache():
     Called by FastAPI whenever “Start Live Stream” is clicked again.
     Clears the in‐memory cache.
     """
-    global live_ticks_cache
+    global live_ticks_cache, live_quotes
     live_ticks_cache = []
+    live_quotes = {}
+    shared_state.live_spot = 0.0
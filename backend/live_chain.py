@@ -0,0 +1,185 @@
+import re
+from datetime import datetime
+from typing import List, Dict, Any
+
+import pandas as pd
+
+import shared_state
+from gex_logic import (
+    filter_strikes_around_spot,
+    compute_metrics,
+    separate_calls_puts,
+    calculate_zero_gamma_level,
+)
+
+# ------------------------------------------------------------------------------------
+# Live-chain pipeline shared by /live_data and the chain-update listeners:
+# raw ticks -> per-strike frame -> long call/put frame -> metrics.
+# ------------------------------------------------------------------------------------
+
+
+def parse_option_data(responses: List[dict], quotes: Dict[str, dict] = None) -> pd.DataFrame:
+    """
+    Folds Greeks ticks (last one per instrument wins) and, when given, the latest
+    realtime quotes (LTP / volume per instrument) into one row per strike.
+    """
+    records: Dict[int, Dict[str, Any]] = {}
+
+    for item in responses:
+        instr = item.get("InstrumentIdentifier", "")
+        m = re.match(r".*_(CE|PE)_(\d+)$", instr)
+        if not m:
+            continue
+        opt_type, strike_str = m.groups()
+        strike = int(strike_str)
+
+        if strike not in records:
+            records[strike] = {}
+
+        prefix = "Call" if opt_type == "CE" else "Put"
+        records[strike][f"{prefix} OI"] = item.get("OpenInterest", 0)
+        records[strike][f"{prefix} Delta"] = item.get("Delta", 0)
+        records[strike][f"{prefix} Gamma"] = item.get("Gamma", 0)
+        records[strike][f"{prefix} Theta"] = item.get("Theta", 0)
+
+        records[strike]["Strike Price"] = strike
+        records[strike]["OptionType"] = opt_type
+        records[strike]["OI"] = item.get("OpenInterest", 0)
+        records[strike]["Delta"] = item.get("Delta", 0)
+        records[strike]["Gamma"] = item.get("Gamma", 0)
+        records[strike]["Theta"] = item.get("Theta", 0)
+        records[strike]["Vega"] = item.get("Vega", 0)
+
+    for instr, quote in (quotes or {}).items():
+        m = re.match(r".*_(CE|PE)_(\d+)$", instr)
+        if not m or int(m.group(2)) not in records:
+            continue
+        prefix = "Call" if m.group(1) == "CE" else "Put"
+        records[int(m.group(2))][f"{prefix} LTP"] = quote.get("LTP", 0)
+        records[int(m.group(2))][f"{prefix} Volume"] = quote.get("Volume", 0)
+
+    rows: List[Dict[str, Any]] = []
+    for strike, data in records.items():
+        row = {
+            "Strike Price": data.get("Strike Price", strike),
+            "OptionType": data.get("OptionType", ""),
+            "OI": data.get("OI", 0),
+            "Delta": data.get("Delta", 0),
+            "Gamma": data.get("Gamma", 0),
+            "Theta": data.get("Theta", 0),
+            "Vega": data.get("Vega", 0),
+            "Call OI": data.get("Call OI", 0),
+            "Call Delta": data.get("Call Delta", 0),
+            "Call Gamma": data.get("Call Gamma", 0),
+            "Call Theta": data.get("Call Theta", 0),
+            "Put OI": data.get("Put OI", 0),
+            "Put Delta": data.get("Put Delta", 0),
+            "Put Gamma": data.get("Put Gamma", 0),
+            "Put Theta": data.get("Put Theta", 0),
+            "Call LTP": data.get("Call LTP", 0),
+            "Call Volume": data.get("Call Volume", 0),
+            "Put LTP": data.get("Put LTP", 0),
+            "Put Volume": data.get("Put Volume", 0),
+        }
+        rows.append(row)
+
+    return pd.DataFrame(rows) if rows else pd.DataFrame()
+
+
+def to_long_frame(df_live: pd.DataFrame) -> pd.DataFrame:
+    long_rows: List[Dict[str, Any]] = []
+    for _, row in df_live.iterrows():
+        strike = row["Strike Price"]
+        long_rows.extend([
+            {"Strike Price": strike, "OptionType": "C", "OI": row.get("Call OI", 0), "Delta": row.get("Call Delta", 0),
+             "Gamma": row.get("Call Gamma", 0), "Theta": row.get("Call Theta", 0), "Vega": row.get("Vega", 0),
+             "LTP": row.get("Call LTP", 0), "Volume": row.get("Call Volume", 0)},
+            {"Strike Price": strike, "OptionType": "P", "OI": row.get("Put OI", 0), "Delta": row.get("Put Delta", 0),
+             "Gamma": row.get("Put Gamma", 0), "Theta": row.get("Put Theta", 0), "Vega": row.get("Vega", 0),
+             "LTP": row.get("Put LTP", 0), "Volume": row.get("Put Volume", 0)}
+        ])
+    return pd.DataFrame(long_rows)
+
+
+def time_to_expiry(expiry_str: str) -> float:
+    try:
+        expiry_dt = datetime.strptime(expiry_str, "%d%b%Y")
+        days_to_expiry = (expiry_dt - datetime.now()).total_seconds() / 86400
+        return max(days_to_expiry / 365.0, 1e-6)
+    except Exception:
+        return 1e-6
+
+
+def current_spot() -> float:
+    """
+    Live futures LTP when the quote stream has delivered one, else the rounded
+    centre spot the chain subscription was built around.
+    """
+    return shared_state.live_spot or float(shared_state.live_center_spot)
+
+
+def grid_spot(spot: float) -> int:
+    """
+    Strike on the subscription grid nearest to spot. The charts use a categorical
+    strike axis, so the spot marker must sit on an actual strike.
+    """
+    center = shared_state.live_center_spot
+    step = shared_state.live_contract_step or 1
+    if not center:
+        return int(round(spot))
+    return int(center + round((spot - center) / step) * step)
+
+
+def compute_live_metrics(df_live: pd.DataFrame, center_spot=None, spot=None):
+    """
+    Runs the metric pipeline on a parsed live chain. Strikes are selected around
+    center_spot (the subscription grid); Greeks-derived terms use the live spot.
+    Returns (df_metrics, calls_df, puts_df, merged, zero_gamma_level); raises
+    ValueError when no strikes fall inside the configured window.
+    """
+    if center_spot is None:
+        center_spot = shared_state.live_center_spot
+    if spot is None:
+        spot = current_spot()
+
+    df_sel = filter_strikes_around_spot(
+        to_long_frame(df_live),
+        center_spot,
+        n=shared_state.live_strike_range,
+        step=shared_state.live_contract_step
+    )
+    T = time_to_expiry(shared_state.live_stream_config.get("expiry", ""))
+
+    df_metrics = compute_metrics(df_sel, spot, 75, 0.15, T)
+    calls_df, puts_df = separate_calls_puts(df_metrics)
+    merged, zero_gamma_level = calculate_zero_gamma_level(calls_df, puts_df)
+    return df_metrics, calls_df, puts_df, merged, zero_gamma_level
+
+
+class SpotRescaler:
+    """
+    Spot-only updates between chain versions. GEX is OI·size·Gamma·spot², so the
+    last rebuild's net Gamma·OI sum is cached and net GEX at a new spot is a single
+    multiply. Scaling every strike by the same positive factor leaves the sign
+    pattern of net GEX, and hence the zero-gamma level, unchanged; dealer delta
+    comes straight from feed deltas and is spot-independent here.
+    """
+
+    def __init__(self):
+        self.metrics = None
+        self.net_gamma_oi = 0.0
+
+    def reset(self):
+        self.__init__()
+
+    def rebase(self, spot: float, metrics: dict):
+        self.metrics = dict(metrics, spot=spot)
+        self.net_gamma_oi = metrics["net_gex"] / (spot * spot) if spot else 0.0
+
+    def at_spot(self, spot: float):
+        if self.metrics is None:
+            return None
+        return dict(self.metrics, spot=spot, net_gex=self.net_gamma_oi * spot * spot)
+
+
+spot_rescaler = SpotRescaler()
@@ -1,26 +1,31 @@
 from fastapi import FastAPI, UploadFile, Form, Request, HTTPException, Query, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-import pandas as pd
-import io, re, math
-from typing import List, Dict, Any
+import math, json
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 import __main__ as main
 import shared_state
 import asyncio
+import time
 from datetime import datetime, timedelta
 
 from gex_logic import (
-    filter_strikes_around_spot,
-    compute_metrics,
-    separate_calls_puts,
-    calculate_zero_gamma_level,
-    summarize,
     format_output_series,
+    process_all,
+    classify_sentiment,
+    find_gamma_wall,
+    MIN_MAX_POINTS,
 )
+from chain_schema import read_option_chain
 
 import globaldata_ws
+import checkpoint
+from live_chain import parse_option_data, compute_live_metrics, current_spot, grid_spot, spot_rescaler
+from rolling_analytics import live_analytics
+from oi_flow import live_oi_flow
+from gex_alerts import alert_engine
 
 app = FastAPI()
 
@@ -31,10 +36,89 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-live_expiry_str: str = ""
 live_strike_range: int = 5
 live_center_spot: int = 0
 
+def publish_live_metrics(metrics: Dict[str, Any], version: int, now: float):
+    """
+    Feeds a full chain rebuild into the rolling analytics and the alert rules.
+    """
+    live_analytics.update(now, {
+        "net_gex": metrics["net_gex"],
+        "zero_gamma": metrics["zero_gamma"],
+        "dealer_delta": metrics["dealer_delta"],
+    })
+
+    matrix = live_oi_flow.matrix
+    oi_deltas = {} if matrix is None else dict(zip(matrix.strikes.tolist(), matrix.deltas_vs_open()["oi"].tolist()))
+
+    alert_engine.evaluate(
+        shared_state.live_stream_config.get("symbol", ""),
+        metrics,
+        oi_change=oi_deltas.get,
+        chain_version=version,
+        now=now,
+    )
+
+def on_chain_update(version: int):
+    """
+    Chain-update listener: rebuilds the live metrics for the latest chain version
+    (once per event-loop iteration, however many messages arrived) and rebases the
+    spot rescaler on them.
+    """
+    df_live = parse_option_data(globaldata_ws.live_ticks_cache, globaldata_ws.live_quotes)
+    if df_live.empty or not shared_state.live_center_spot:
+        return
+    spot = current_spot()
+    try:
+        df_metrics, calls_df, puts_df, merged, zero_gamma_level = compute_live_metrics(df_live, spot=spot)
+    except ValueError:
+        return
+    metrics = {
+        "spot": spot,
+        "net_gex": float(merged["Net GEX"].sum()),
+        "zero_gamma": zero_gamma_level,
+        "gamma_wall": find_gamma_wall(df_metrics),
+        "sentiment": classify_sentiment(calls_df, puts_df),
+        "dealer_delta": float(df_metrics["Dealer Delta Exposure"].sum()),
+    }
+    spot_rescaler.rebase(spot, metrics)
+    publish_live_metrics(metrics, version, time.time())
+
+def on_spot_update(spot: float):
+    """
+    Futures tick between chain versions: rescale the cached Gamma·OI totals to the
+    new spot instead of rebuilding the chain.
+    """
+    metrics = spot_rescaler.at_spot(spot)
+    if metrics is None:
+        return
+    now = time.time()
+    # only net GEX moves with spot; re-sampling zero-gamma / dealer delta here would
+    # weight their statistics by the futures tick rate
+    live_analytics.update(now, {"net_gex": metrics["net_gex"]})
+    alert_engine.evaluate(
+        shared_state.live_stream_config.get("symbol", ""),
+        metrics,
+        chain_version=globaldata_ws.chain_version,
+        now=now,
+        changed=("spot", "net_gex"),
+    )
+
+globaldata_ws.add_spot_listener(on_spot_update)
+globaldata_ws.add_chain_update_listener(on_chain_update)
+
+def update_oi_flow(tick: Dict[str, Any]):
+    live_oi_flow.on_tick(
+        tick,
+        shared_state.live_center_spot,
+        shared_state.live_strike_range,
+        shared_state.live_contract_step,
+        spot=current_spot(),
+    )
+
+globaldata_ws.add_tick_listener(update_oi_flow)
+
 @app.on_event("startup")
 async def schedule_trending_gex_sampler():
     async def sampler():
@@ -52,28 +136,14 @@ async def schedule_trending_gex_sampler():
         while True:
             # compute net GEX exactly as in /live_data
             raw_list = globaldata_ws.live_ticks_cache.copy()
-            df_live = parse_option_data(raw_list)
-            if not df_live.empty:
-                # reuse same logic as your GET /live_data
-                center_spot = shared_state.live_center_spot
-                df_sel = filter_strikes_around_spot(
-                    df_live.pipe(lambda d: pd.DataFrame([ 
-                      {"Strike Price": r["Strike Price"], "OptionType": t, **{
-                          "OI": r[f"{'Call' if t=='C' else 'Put'} OI"],
-                          "Delta": r[f"{'Call' if t=='C' else 'Put'} Delta"],
-                          "Gamma": r[f"{'Call' if t=='C' else 'Put'} Gamma"],
-                          "Theta": r[f"{'Call' if t=='C' else 'Put'} Theta"],
-                          "Vega": r.get("Vega", 0)
-                      }} for _, r in d.iterrows() for t in ("C","P")
-                    ])),
-                    center_spot,
-                    n=shared_state.live_strike_range,
-                    step=shared_state.live_contract_step
-                )
-                df_metrics = compute_metrics(df_sel, center_spot, 75, 0.15, 1e-6)
-                calls_df, puts_df = separate_calls_puts(df_metrics)
-                merged, _ = calculate_zero_gamma_level(calls_df, puts_df)
-
+            df_live = parse_option_data(raw_list, globaldata_ws.live_quotes)
+            merged = None
+            if not df_live.empty and shared_state.live_center_spot:
+                try:
+                    _, _, _, merged, _ = compute_live_metrics(df_live)
+                except ValueError:
+                    merged = None
+            if merged is not None:
                 #current_net_gex = merged["Net GEX"].sum()
                 # … after calculate_zero_gamma_level …
                 # use the 1%‐scaled GEX exactly as in /live_data
@@ -92,6 +162,31 @@ async def schedule_trending_gex_sampler():
     # launch the sampler task
     asyncio.create_task(sampler())
 
+@app.on_event("startup")
+async def warm_start_from_checkpoint():
+    snapshot = checkpoint.load_checkpoint()
+    if snapshot is not None:
+        checkpoint.restore_checkpoint(snapshot)
+        if checkpoint.resume_stream():
+            print(f"[CKPT] Resumed stream for {shared_state.live_stream_config.get('symbol')}")
+
+    asyncio.create_task(checkpoint.checkpoint_loop())
+
+@app.on_event("shutdown")
+async def write_final_checkpoint():
+    checkpoint.save_checkpoint()
+
+def live_staleness() -> Dict[str, Any]:
+    """
+    Marks /live_data responses served from a warm-start checkpoint until the
+    feed delivers its first fresh tick.
+    """
+    restored_at = shared_state.live_restored_at
+    return {
+        "stale": restored_at is not None,
+        "as_of": datetime.fromtimestamp(restored_at).isoformat() if restored_at else None,
+    }
+
 @app.get("/gfdl/expiry_list")
 async def get_expiry_list():
     return ["26JUN2025"]
@@ -100,12 +195,9 @@ async def get_expiry_list():
 async def get_raw_ticks():
     return JSONResponse(content=globaldata_ws.live_ticks_cache)
 
-def load_excel_with_strike_detection(content_bytes: bytes) -> pd.DataFrame:
-    for skip in range(10):
-        df = pd.read_excel(io.BytesIO(content_bytes), engine="openpyxl", skiprows=skip)
-        if any("strike" in col.lower() for col in df.columns if isinstance(col, str)):
-            return df
-    raise ValueError("No 'Strike Price' column found in first 10 rows.")
+@app.get("/raw_quotes")
+async def get_raw_quotes():
+    return JSONResponse(content={"spot": shared_state.live_spot, "options": globaldata_ws.live_quotes})
 
 @app.post("/compute")
 async def compute(
@@ -115,15 +207,15 @@ async def compute(
     contractSize: int = Form(...),
     vol: float = Form(...),
     expiry: float = Form(...),
+    maxPoints: Optional[int] = Form(None),
+    bucket: Optional[int] = Form(None),
 ):
     content = await file.read()
-    if file.filename.endswith((".xls", ".xlsx")):
-        df = load_excel_with_strike_detection(content)
-    else:
-        df = pd.read_csv(io.StringIO(content.decode("utf-8")))
-
-    from gex_logic import process_all
-    result = process_all(df, spot, strikes, contractSize, vol, expiry)
+    try:
+        df = read_option_chain(content, file.filename)
+        result = process_all(df, spot, strikes, contractSize, vol, expiry, maxPoints, bucket)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     for key in (
         "net_gex_1pct",
@@ -142,7 +234,7 @@ async def compute(
 
 @app.post("/start_stream")
 async def start_stream(req: Request):
-    global live_expiry_str, live_strike_range, live_center_spot
+    global live_strike_range, live_center_spot
 
     body = await req.json()
     symbol = body.get("symbol")
@@ -154,10 +246,20 @@ async def start_stream(req: Request):
     if not symbol or not expiry or expiry.upper() == "UNKNOWN":
         raise HTTPException(status_code=400, detail="Invalid or missing expiry.")
 
-    live_expiry_str = expiry
     shared_state.live_strike_range = strike_range
     shared_state.live_contract_step = contract_step
     live_center_spot = 0  # will be recomputed later from live ticks
+    shared_state.live_stream_config = {
+        "symbol": symbol,
+        "expiry": expiry,
+        "spot": spot,
+        "strike_range": strike_range,
+        "contract_step": contract_step,
+    }
+    shared_state.live_restored_at = None
+    live_analytics.reset()
+    live_oi_flow.reset()
+    spot_rescaler.reset()
 
     globaldata_ws.clear_live_cache()
     globaldata_ws.start_background_ws_loop(
@@ -170,61 +272,13 @@ async def start_stream(req: Request):
 
     return {"status": "WebSocket started", "symbol": symbol, "expiry": expiry}
 
-def parse_option_data(responses: List[dict]) -> pd.DataFrame:
-    records: Dict[int, Dict[str, Any]] = {}
-
-    for item in responses:
-        instr = item.get("InstrumentIdentifier", "")
-        m = re.match(r".*_(CE|PE)_(\d+)$", instr)
-        if not m:
-            continue
-        opt_type, strike_str = m.groups()
-        strike = int(strike_str)
-
-        if strike not in records:
-            records[strike] = {}
-
-        prefix = "Call" if opt_type == "CE" else "Put"
-        records[strike][f"{prefix} OI"] = item.get("OpenInterest", 0)
-        records[strike][f"{prefix} Delta"] = item.get("Delta", 0)
-        records[strike][f"{prefix} Gamma"] = item.get("Gamma", 0)
-        records[strike][f"{prefix} Theta"] = item.get("Theta", 0)
-
-        records[strike]["Strike Price"] = strike
-        records[strike]["OptionType"] = opt_type
-        records[strike]["OI"] = item.get("OpenInterest", 0)
-        records[strike]["Delta"] = item.get("Delta", 0)
-        records[strike]["Gamma"] = item.get("Gamma", 0)
-        records[strike]["Theta"] = item.get("Theta", 0)
-        records[strike]["Vega"] = item.get("Vega", 0)
-
-    rows: List[Dict[str, Any]] = []
-    for strike, data in records.items():
-        row = {
-            "Strike Price": data.get("Strike Price", strike),
-            "OptionType": data.get("OptionType", ""),
-            "OI": data.get("OI", 0),
-            "Delta": data.get("Delta", 0),
-            "Gamma": data.get("Gamma", 0),
-            "Theta": data.get("Theta", 0),
-            "Vega": data.get("Vega", 0),
-            "Call OI": data.get("Call OI", 0),
-            "Call Delta": data.get("Call Delta", 0),
-            "Call Gamma": data.get("Call Gamma", 0),
-            "Call Theta": data.get("Call Theta", 0),
-            "Put OI": data.get("Put OI", 0),
-            "Put Delta": data.get("Put Delta", 0),
-            "Put Gamma": data.get("Put Gamma", 0),
-            "Put Theta": data.get("Put Theta", 0),
-        }
-        rows.append(row)
-
-    return pd.DataFrame(rows) if rows else pd.DataFrame()
-
 @app.get("/live_data")
-async def get_live_option_data():
+async def get_live_option_data(
+    max_points: Optional[int] = Query(default=None, ge=MIN_MAX_POINTS),
+    bucket: Optional[int] = Query(default=None, ge=1),
+):
     raw_list: List[Dict[str, Any]] = globaldata_ws.live_ticks_cache.copy()
-    df_live = parse_option_data(raw_list)
+    df_live = parse_option_data(raw_list, globaldata_ws.live_quotes)
 
     if df_live.empty:
         return JSONResponse(content={
@@ -237,30 +291,15 @@ async def get_live_option_data():
             "summary_text": "",
             "sentiment": "",
             "spot": 0,
+            "live_spot": 0.0,
+            **live_staleness(),
         })
 
     center_spot = shared_state.live_center_spot
-
-    long_rows: List[Dict[str, Any]] = []
-    for _, row in df_live.iterrows():
-        strike = row["Strike Price"]
-        long_rows.extend([
-            {"Strike Price": strike, "OptionType": "C", "OI": row.get("Call OI", 0), "Delta": row.get("Call Delta", 0),
-             "Gamma": row.get("Call Gamma", 0), "Theta": row.get("Call Theta", 0), "Vega": row.get("Vega", 0)},
-            {"Strike Price": strike, "OptionType": "P", "OI": row.get("Put OI", 0), "Delta": row.get("Put Delta", 0),
-             "Gamma": row.get("Put Gamma", 0), "Theta": row.get("Put Theta", 0), "Vega": row.get("Vega", 0)}
-        ])
-    df_long = pd.DataFrame(long_rows)
+    spot = current_spot()
 
     try:
-        df_sel = filter_strikes_around_spot(
-                    df_long,
-                    center_spot,
-                    n=shared_state.live_strike_range,
-                    step=shared_state.live_contract_step
-                )
-
-
+        df_metrics, calls_df, puts_df, merged, zero_gamma_level = compute_live_metrics(df_live, center_spot, spot)
     except ValueError:
         return JSONResponse(content={
             "net_gex_1pct": [],
@@ -271,28 +310,25 @@ async def get_live_option_data():
             "vega_theta_ratio": [],
             "summary_text": "",
             "sentiment": "",
-            "spot": center_spot,
+            "spot": grid_spot(spot),
+            "live_spot": spot,
+            **live_staleness(),
         })
 
-    try:
-        expiry_dt = datetime.strptime(live_expiry_str, "%d%b%Y")
-        days_to_expiry = (expiry_dt - datetime.now()).total_seconds() / 86400
-        T = max(days_to_expiry / 365.0, 1e-6)
-    except Exception:
-        T = 1e-6
-
-    df_metrics = compute_metrics(df_sel, center_spot, 75, 0.15, T)
-    calls_df, puts_df = separate_calls_puts(df_metrics)
-    merged, zero_gamma_level = calculate_zero_gamma_level(calls_df, puts_df)
-    c_sum, p_sum = summarize(calls_df, puts_df)
-    current_net_gex = merged["Net GEX"].sum()
-
-    shared_state.live_gex_history.append(current_net_gex)
-
-    rolling_gex_ma = sum(shared_state.live_gex_history) / len(shared_state.live_gex_history)
+    # time-weighted (5 min) mean of net GEX, independent of polling and of the tick rate
+    rolling_gex_ma = live_analytics.metrics["net_gex"].stats(300)["mean"]
+    if rolling_gex_ma is None:
+        rolling_gex_ma = float(merged["Net GEX"].sum())
 
-    result = format_output_series(df_metrics, merged, calls_df, puts_df, zero_gamma_level, center_spot)
+    result = format_output_series(
+        df_metrics, merged, calls_df, puts_df, zero_gamma_level, spot, max_points, bucket
+    )
+    # "spot" marks the chart's strike axis; the futures LTP is reported separately
+    result["spot"] = grid_spot(spot)
+    result["live_spot"] = spot
+    result["center_spot"] = center_spot
     result["rolling_gex_ma"] = rolling_gex_ma
+    result.update(live_staleness())
     return JSONResponse(content=result)
 
 
@@ -300,6 +336,114 @@ async def get_live_option_data():
 async def root():
     return {"message": "GEX Analyzer backend is up and running."}
 
+@app.get("/live_analytics")
+async def get_live_analytics(windows: List[int] = Query(default=None)):
+    """
+    Rolling EMA / mean / std / z-score / rate of change (per minute) for net GEX,
+    the zero-gamma level and net dealer delta, e.g. /live_analytics?windows=60&windows=900
+    """
+    try:
+        stats = live_analytics.snapshot(windows)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=str(e.args[0]))
+    return {
+        "chain_version": globaldata_ws.chain_version,
+        "last_update": live_analytics.last_update,
+        "windows": list(windows or live_analytics.window_list),
+        "metrics": stats,
+        **live_staleness(),
+    }
+
+@app.get("/oi_flow")
+async def get_oi_flow(field: str = "oi", last: int = Query(default=None, ge=1)):
+    """
+    Strike × time heatmap for one field (oi, call_oi, put_oi, gex, dealer_delta),
+    oldest bucket first, plus per-strike change of every field versus the open.
+    """
+    matrix = live_oi_flow.matrix
+    if matrix is None:
+        return {"field": field, "strikes": [], "times": [], "matrix": [], "deltas_vs_open": {}}
+    try:
+        view = matrix.window(field, last)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=str(e.args[0]))
+
+    def finite(v): return v if math.isfinite(v) else None
+
+    strikes = matrix.strikes.tolist()
+    return {
+        "field": field,
+        "bucket_seconds": matrix.bucket_seconds,
+        "strikes": strikes,
+        "times": [datetime.fromtimestamp(t).strftime("%H:%M") for t in matrix.bucket_starts(last).tolist()],
+        "matrix": [[finite(v) for v in row] for row in view.tolist()],
+        "deltas_vs_open": {
+            name: [{"strike": k, "value": finite(v)} for k, v in zip(strikes, values.tolist())]
+            for name, values in matrix.deltas_vs_open().items()
+        },
+    }
+
+@app.get("/alerts/rules")
+async def get_alert_rules():
+    return alert_engine.rules()
+
+@app.post("/alerts/rules")
+async def add_alert_rules(req: Request):
+    """
+    Body: one rule dict or a list of them (see gex_alerts for the rule format).
+    Rules with an existing id are replaced.
+    """
+    body = await req.json()
+    try:
+        return alert_engine.add_rules(body if isinstance(body, list) else [body])
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.delete("/alerts/rules/{rule_id}")
+async def delete_alert_rule(rule_id: str):
+    if not alert_engine.remove_rule(rule_id):
+        raise HTTPException(status_code=404, detail=f"No rule '{rule_id}'.")
+    return {"status": "deleted", "id": rule_id}
+
+@app.post("/alerts/webhooks")
+async def add_alert_webhook(req: Request):
+    """
+    Body (application/json): {"name": ..., "url": "http://127.0.0.1:<port>/..."}.
+    Only loopback http(s) URLs are accepted.
+    """
+    # a JSON content type keeps cross-origin "simple" (text/plain) requests out
+    if req.headers.get("content-type", "").split(";")[0].strip() != "application/json":
+        raise HTTPException(status_code=400, detail="Content-Type must be application/json.")
+    try:
+        body = await req.json()
+        name, url = body.get("name"), body.get("url")
+        alert_engine.add_webhook(name, url)
+    except (ValueError, AttributeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "registered", "name": name, "url": url}
+
+@app.get("/alerts")
+async def get_recent_alerts(limit: int = Query(default=100, ge=1)):
+    return list(alert_engine.recent)[-limit:]
+
+@app.get("/alerts/stream")
+async def stream_alerts():
+    """
+    Server-sent events: one `data:` line of JSON per fired alert.
+    """
+    sink = alert_engine.sinks["stream"]
+    q = sink.subscribe()
+
+    async def events():
+        try:
+            while True:
+                alert = await q.get()
+                yield f"data: {json.dumps(alert)}\n\n"
+        finally:
+            sink.unsubscribe(q)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
 @app.get("/trending_gex")
 async def get_trending_gex():
     rows = list(shared_state.trending_history)
@@ -0,0 +1,204 @@
+import math
+import re
+import time
+
+import numpy as np
+
+# ------------------------------------------------------------------------------------
+# Per-strike flow matrix: (time bucket × strike) ring buffer of open interest, net GEX
+# and dealer delta, filled tick by tick.
+#
+# Storage is preallocated once per stream (fixed size regardless of session length).
+# Rows are mirrored into a buffer of 2 × n_buckets, so the most recent k ≤ n_buckets
+# rows are always one contiguous block and reads are zero-copy NumPy views.
+# ------------------------------------------------------------------------------------
+FIELDS = ("oi", "call_oi", "put_oi", "gex", "dealer_delta")
+OI, CALL_OI, PUT_OI, GEX, DEALER_DELTA = range(len(FIELDS))
+
+DEFAULT_BUCKET_SECONDS = 60
+DEFAULT_BUCKETS = 400  # > one 6h15m session at 1-minute buckets
+
+_instr_regex = re.compile(r"_(CE|PE)_(\d+)$")
+
+
+class StrikeFlowMatrix:
+    def __init__(self, strikes, bucket_seconds=DEFAULT_BUCKET_SECONDS, n_buckets=DEFAULT_BUCKETS,
+                 contract_size=75):
+        self.strikes = np.asarray(strikes, dtype=np.int64)
+        self.n_strikes = len(self.strikes)
+        self.bucket_seconds = int(bucket_seconds)
+        self.n_buckets = int(n_buckets)
+        self.contract_size = contract_size
+        self._column = {int(k): j for j, k in enumerate(self.strikes)}
+
+        self._data = np.full((len(FIELDS), 2 * self.n_buckets, self.n_strikes), np.nan)
+        self._bucket_start = np.zeros(2 * self.n_buckets, dtype=np.int64)
+        # latest per-side values; rows are derived from these on every write
+        self._side = np.zeros((2, 3, self.n_strikes))  # [call/put, (oi, gex, dealer delta), strike]
+        self._side_open = np.full((2, 3, self.n_strikes), np.nan)
+
+        self._bucket_id = None  # absolute bucket number of the current row
+        self._pos = -1          # ring position of the current row
+        self._filled = 0
+
+    # ── writes ──────────────────────────────────────────────────────────────────────
+    def _advance(self, bucket_id: int):
+        if self._bucket_id is None:
+            steps = 1
+        else:
+            steps = min(bucket_id - self._bucket_id, self.n_buckets)
+        prev = self._pos
+        for i in range(steps):
+            self._pos = (self._pos + 1) % self.n_buckets
+            start = (bucket_id - steps + 1 + i) * self.bucket_seconds
+            for p in (self._pos, self._pos + self.n_buckets):
+                self._bucket_start[p] = start
+                # forward-fill: a strike keeps its level until a new tick moves it
+                if prev >= 0:
+                    self._data[:, p, :] = self._data[:, prev, :]
+                else:
+                    self._data[:, p, :] = np.nan
+        self._bucket_id = bucket_id
+        self._filled = min(self._filled + steps, self.n_buckets)
+
+    def update(self, strike: int, is_call: bool, oi: float, gamma: float, delta: float,
+               spot: float, t: float = None):
+        j = self._column.get(int(strike))
+        if j is None:
+            return
+        t = time.time() if t is None else t
+        bucket_id = int(t // self.bucket_seconds)
+        if self._bucket_id is None or bucket_id > self._bucket_id:
+            self._advance(bucket_id)
+
+        side = 0 if is_call else 1
+        self._side[side, 0, j] = oi
+        self._side[side, 1, j] = oi * self.contract_size * gamma * spot * spot
+        self._side[side, 2, j] = oi * self.contract_size * delta
+        if math.isnan(self._side_open[side, 0, j]):
+            self._side_open[side, :, j] = self._side[side, :, j]
+
+        call, put = self._side[0, :, j], self._side[1, :, j]
+        values = (call[0] + put[0], call[0], put[0], call[1] - put[1], call[2] + put[2])
+        for p in (self._pos, self._pos + self.n_buckets):
+            self._data[:, p, j] = values
+
+    # ── zero-copy reads ─────────────────────────────────────────────────────────────
+    def window(self, field: str, last: int = None) -> np.ndarray:
+        """
+        View of the most recent `last` buckets (oldest first) for one field,
+        shape (last, n_strikes). No data is copied.
+        """
+        if field not in FIELDS:
+            raise KeyError(f"Unknown field '{field}'; available: {list(FIELDS)}")
+        k = self._filled if last is None else max(0, min(int(last), self._filled))
+        if k == 0:
+            return self._data[FIELDS.index(field), 0:0, :]
+        end = self._pos + self.n_buckets + 1
+        return self._data[FIELDS.index(field), end - k:end, :]
+
+    def bucket_starts(self, last: int = None) -> np.ndarray:
+        k = self._filled if last is None else max(0, min(int(last), self._filled))
+        end = self._pos + self.n_buckets + 1
+        return self._bucket_start[end - k:end] if k else self._bucket_start[0:0]
+
+    def latest(self, field: str) -> np.ndarray:
+        return self.window(field, 1)[0] if self._filled else np.full(self.n_strikes, np.nan)
+
+    def deltas_vs_open(self) -> dict:
+        """
+        Per-strike change of every field since the first tick of each side
+        (call / put) this session. Strikes never seen report 0.
+        """
+        opened = np.where(np.isnan(self._side_open), self._side, self._side_open)
+        d = self._side - opened
+        call, put = d[0], d[1]
+        return {
+            "oi": call[0] + put[0],
+            "call_oi": call[0],
+            "put_oi": put[0],
+            "gex": call[1] - put[1],
+            "dealer_delta": call[2] + put[2],
+        }
+
+    # ── checkpointing ───────────────────────────────────────────────────────────────
+    def dump(self) -> dict:
+        """
+        JSON-serialisable state: the filled ring rows (oldest first) plus the latest
+        and session-open values per side, so deltas versus open survive a restart.
+        """
+        return {
+            "strikes": self.strikes.tolist(),
+            "bucket_seconds": self.bucket_seconds,
+            "n_buckets": self.n_buckets,
+            "contract_size": self.contract_size,
+            "bucket_id": self._bucket_id,
+            "bucket_starts": self.bucket_starts().tolist(),
+            "rows": [self.window(field).tolist() for field in FIELDS],
+            "side": self._side.tolist(),
+            "side_open": self._side_open.tolist(),
+        }
+
+    @classmethod
+    def from_dump(cls, state: dict) -> "StrikeFlowMatrix":
+        matrix = cls(state["strikes"], state["bucket_seconds"], state["n_buckets"], state["contract_size"])
+        matrix._side[:] = np.asarray(state["side"], dtype=float)
+        matrix._side_open[:] = np.asarray(state["side_open"], dtype=float)
+
+        starts = np.asarray(state["bucket_starts"], dtype=np.int64)[-matrix.n_buckets:]
+        k = len(starts)
+        if k:
+            rows = np.asarray(state["rows"], dtype=float).reshape(len(FIELDS), -1, matrix.n_strikes)[:, -k:, :]
+            for offset in (0, matrix.n_buckets):
+                matrix._data[:, offset:offset + k, :] = rows
+                matrix._bucket_start[offset:offset + k] = starts
+            matrix._pos = k - 1
+            matrix._filled = k
+            matrix._bucket_id = state["bucket_id"]
+        return matrix
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes + self._bucket_start.nbytes + self._side.nbytes + self._side_open.nbytes
+
+
+class LiveOIFlow:
+    """
+    Owns the StrikeFlowMatrix for the running stream. The strike grid is fixed on the
+    first tick once the stream's centre spot is known, and dropped on reset().
+    """
+
+    def __init__(self, bucket_seconds=DEFAULT_BUCKET_SECONDS, n_buckets=DEFAULT_BUCKETS):
+        self.bucket_seconds = bucket_seconds
+        self.n_buckets = n_buckets
+        self.matrix = None
+
+    def reset(self):
+        self.matrix = None
+
+    def dump(self):
+        return None if self.matrix is None else self.matrix.dump()
+
+    def restore(self, state):
+        self.matrix = None if not state else StrikeFlowMatrix.from_dump(state)
+
+    def configure(self, center_spot: int, strike_range: int, contract_step: int):
+        strikes = center_spot + contract_step * np.arange(-strike_range, strike_range + 1)
+        self.matrix = StrikeFlowMatrix(strikes, self.bucket_seconds, self.n_buckets)
+
+    def on_tick(self, tick: dict, center_spot: int, strike_range: int, contract_step: int,
+                spot: float = None, t: float = None):
+        m = _instr_regex.search(tick.get("InstrumentIdentifier", ""))
+        if not m or not center_spot:
+            return
+        if self.matrix is None:
+            self.configure(center_spot, strike_range, contract_step)
+        opt_type, strike = m.groups()
+        self.matrix.update(
+            int(strike), opt_type == "CE",
+            float(tick.get("OpenInterest") or 0), float(tick.get("Gamma") or 0),
+            float(tick.get("Delta") or 0), float(spot or center_spot), t,
+        )
+
+
+live_oi_flow = LiveOIFlow()
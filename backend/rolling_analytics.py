@@ -0,0 +1,180 @@
+import math
+from collections import deque
+
+# ------------------------------------------------------------------------------------
+# Time-windowed rolling analytics for the live chain.
+#
+# Updated from the feed (chain updates, and spot ticks for net GEX), never per HTTP poll.
+# All statistics are time-based, so they depend on wall-clock windows rather than on how
+# often updates arrive. Every update is O(1) amortized per metric and window:
+#   • EMA with time constant = window (alpha = 1 - exp(-dt / window))
+#   • time-weighted rolling mean / std (each value holds until the next sample)
+#   • z-score of the latest value against that mean / std
+#   • rate of change per minute versus the oldest sample in the window
+# ------------------------------------------------------------------------------------
+DEFAULT_WINDOWS = (60, 300, 900)  # seconds
+LIVE_METRICS = ("net_gex", "zero_gamma", "dealer_delta")
+
+
+class _Window:
+    __slots__ = ("seconds", "samples", "shift", "w", "s1", "s2", "ema", "last_t", "last_x")
+
+    def __init__(self, seconds: float):
+        self.seconds = float(seconds)
+        self.samples = deque()
+        self.shift = None  # sums are kept around an early value to limit cancellation
+        self.w = 0.0       # time covered by closed samples (each holds until the next one)
+        self.s1 = 0.0
+        self.s2 = 0.0
+        self.ema = None
+        self.last_t = None
+        self.last_x = None
+
+    def update(self, t: float, x: float):
+        if self.shift is None:
+            self.shift = x
+        if self.samples:
+            # the previous value held from its own timestamp until now
+            dt = max(t - self.last_t, 0.0)
+            d = self.last_x - self.shift
+            self.w += dt
+            self.s1 += dt * d
+            self.s2 += dt * d * d
+        self.samples.append((t, x))
+
+        # a sample leaves once the next one starts before the window does
+        cutoff = t - self.seconds
+        while len(self.samples) > 1 and self.samples[1][0] <= cutoff:
+            t0, old = self.samples.popleft()
+            t1 = self.samples[0][0]
+            dt, od = t1 - t0, old - self.shift
+            self.w -= dt
+            self.s1 -= dt * od
+            self.s2 -= dt * od * od
+        if len(self.samples) == 2:
+            # re-anchor on the single closed sample so drift in x never hurts precision
+            (t0, x0) = self.samples[0]
+            self.shift, self.w, self.s1, self.s2 = x0, t - t0, 0.0, 0.0
+
+        if self.ema is None:
+            self.ema = x
+        else:
+            dt = max(t - self.last_t, 0.0)
+            alpha = 1.0 - math.exp(-dt / self.seconds)
+            self.ema += alpha * (x - self.ema)
+        self.last_t, self.last_x = t, x
+
+    def stats(self) -> dict:
+        """
+        Mean / std are weighted by how long each value held inside the window, so they
+        do not depend on how often updates arrive. The oldest sample may have started
+        before the window; only its in-window part counts.
+        """
+        n = len(self.samples)
+        if n == 0:
+            return {"n": 0, "ema": None, "mean": None, "std": None, "zscore": None, "roc": None}
+        start = self.last_t - self.seconds
+        t0, x0 = self.samples[0]
+        excess = max(start - t0, 0.0)
+        d0 = x0 - self.shift
+        w = self.w - excess
+        if w > 0:
+            mean_d = (self.s1 - excess * d0) / w
+            var = max((self.s2 - excess * d0 * d0) / w - mean_d * mean_d, 0.0)
+            mean, std = self.shift + mean_d, math.sqrt(var)
+        else:
+            mean, std = self.last_x, 0.0
+        span = self.last_t - max(t0, start)
+        return {
+            "n": n,
+            "ema": self.ema,
+            "mean": mean,
+            "std": std,
+            "zscore": (self.last_x - mean) / std if std > 0 else 0.0,
+            "roc": (self.last_x - x0) / span * 60.0 if span > 0 else 0.0,
+        }
+
+
+class RollingMetric:
+    def __init__(self, windows=DEFAULT_WINDOWS):
+        self.windows = {int(w): _Window(w) for w in windows}
+        self.last = None
+
+    def update(self, t: float, x: float):
+        self.last = x
+        for w in self.windows.values():
+            w.update(t, x)
+
+    def stats(self, window: int) -> dict:
+        if window not in self.windows:
+            raise KeyError(f"Unknown window {window}s; available: {sorted(self.windows)}")
+        return self.windows[window].stats()
+
+
+class LiveAnalytics:
+    """
+    Rolling statistics for a fixed set of named metrics. Values of None (e.g. no
+    zero-gamma crossing in the current chain) are skipped for that metric only.
+    """
+
+    def __init__(self, metrics=LIVE_METRICS, windows=DEFAULT_WINDOWS):
+        self.window_list = tuple(int(w) for w in windows)
+        self.metrics = {name: RollingMetric(self.window_list) for name in metrics}
+        # raw events for the largest window, so state can be checkpointed and replayed
+        self.events = deque()
+        self.last_update = None
+
+    def update(self, t: float, values: dict):
+        clean = {}
+        for name, x in values.items():
+            if name in self.metrics and x is not None and math.isfinite(x):
+                clean[name] = float(x)
+                self.metrics[name].update(t, clean[name])
+        self.events.append((t, clean))
+        # keep the values in force at the start of the largest window for replay: an
+        # evicted value moves up to the next (also pre-window) event unless superseded
+        cutoff = t - max(self.window_list)
+        while len(self.events) > 1 and self.events[1][0] <= cutoff:
+            _, old = self.events.popleft()
+            for name, x in old.items():
+                self.events[0][1].setdefault(name, x)
+        self.last_update = t
+
+    def snapshot(self, windows=None) -> dict:
+        windows = self.window_list if windows is None else tuple(int(w) for w in windows)
+        return {
+            name: {
+                "last": metric.last,
+                "windows": {str(w): metric.stats(w) for w in windows},
+            }
+            for name, metric in self.metrics.items()
+        }
+
+    def reset(self):
+        self.__init__(tuple(self.metrics), self.window_list)
+
+    def dump_events(self) -> list:
+        return [[t, values] for t, values in self.events]
+
+    def replay(self, events):
+        for t, values in events:
+            self.update(t, values)
+
+    def dump_ema(self) -> dict:
+        """
+        EMAs carry history from before the retained events, so they are saved as is.
+        """
+        return {
+            name: {str(w): window.ema for w, window in metric.windows.items()}
+            for name, metric in self.metrics.items()
+        }
+
+    def load_ema(self, state: dict):
+        for name, emas in (state or {}).items():
+            metric = self.metrics.get(name)
+            for w, ema in emas.items():
+                if metric is not None and int(w) in metric.windows and ema is not None:
+                    metric.windows[int(w)].ema = float(ema)
+
+
+live_analytics = LiveAnalytics()
@@ -3,5 +3,7 @@ from collections import deque
 live_center_spot = 0  # this will hold the rounded spot price
 live_strike_range = 15      
 live_contract_step = 50
-live_gex_history = deque(maxlen=15)
-trending_history = deque(maxlen=100)  # keep up to last 100 intervals
\ No newline at end of file
+trending_history = deque(maxlen=100)  # keep up to last 100 intervals
+live_stream_config = {}  # last /start_stream parameters, persisted for warm start
+live_restored_at = None  # checkpoint time while serving restored (stale) data
+live_spot = 0.0  # latest futures LTP from the realtime quote stream (0 until known)
@@ -0,0 +1,43 @@
+import os
+import sys
+
+# backend modules use flat imports (``import shared_state``), as under uvicorn
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture
+def live_state(monkeypatch):
+    """
+    Fresh live-stream globals for one test; everything is put back afterwards so
+    no test starts from another test's stream (or a "stale" warm start).
+    """
+    import shared_state
+    import globaldata_ws
+    from live_chain import spot_rescaler
+    from oi_flow import live_oi_flow
+    from rolling_analytics import live_analytics
+
+    for name in ("live_center_spot", "live_strike_range", "live_contract_step",
+                 "live_restored_at", "live_spot"):
+        monkeypatch.setattr(shared_state, name, getattr(shared_state, name))
+    monkeypatch.setattr(shared_state, "live_stream_config", {})
+    monkeypatch.setattr(shared_state, "trending_history", type(shared_state.trending_history)(
+        maxlen=shared_state.trending_history.maxlen))
+    monkeypatch.setattr(globaldata_ws, "live_ticks_cache", [])
+    monkeypatch.setattr(globaldata_ws, "live_quotes", {})
+    monkeypatch.setattr(globaldata_ws, "chain_version", globaldata_ws.chain_version)
+    monkeypatch.setattr(globaldata_ws, "_chain_update_pending", False)
+
+    analytics_events = live_analytics.dump_events()
+    oi_matrix = live_oi_flow.matrix
+    rescaler = (spot_rescaler.metrics, spot_rescaler.net_gamma_oi)
+    live_analytics.reset()
+    live_oi_flow.reset()
+    spot_rescaler.reset()
+    yield shared_state
+    live_analytics.reset()
+    live_analytics.replay(analytics_events)
+    live_oi_flow.matrix = oi_matrix
+    spot_rescaler.metrics, spot_rescaler.net_gamma_oi = rescaler
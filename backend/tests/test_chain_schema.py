@@ -0,0 +1,62 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+import chain_schema
+
+
+def _chain_frame():
+    strikes = np.arange(23000, 24100, 50)
+    n = len(strikes)
+    return pd.DataFrame({
+        "CE OI": np.arange(n) + 100.0,
+        "CE Delta": np.linspace(0.9, 0.1, n),
+        "CE Gamma": np.full(n, 0.001),
+        "CE Theta": np.full(n, -5.0),
+        "Strike Price": strikes,
+        "PE OI": np.arange(n) + 200.0,
+        "PE Delta": np.linspace(-0.1, -0.9, n),
+        "PE Gamma": np.full(n, 0.001),
+        "PE Theta": np.full(n, -4.0),
+    })
+
+
+def _xlsx_with_title_rows(df, title_rows=2):
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="openpyxl") as writer:
+        pd.DataFrame([["Broker export"], ["NIFTY"]][:title_rows]).to_excel(
+            writer, index=False, header=False)
+        df.to_excel(writer, index=False, startrow=title_rows)
+    return buf.getvalue()
+
+
+def test_excel_and_csv_with_same_header_do_not_share_skiprows(tmp_path):
+    registry = chain_schema.SchemaRegistry(str(tmp_path / "schemas.json"))
+    df = _chain_frame()
+
+    from_xlsx = chain_schema.read_option_chain(_xlsx_with_title_rows(df), "chain.xlsx", registry)
+    csv_bytes = df.to_csv(index=False).encode("utf-8")
+    first_csv = chain_schema.read_option_chain(csv_bytes, "chain.csv", registry)
+    typed_csv = chain_schema.read_option_chain(csv_bytes, "chain.csv", registry)
+
+    expected = sorted(df["Strike Price"].astype(float))
+    for out in (from_xlsx, first_csv, typed_csv):
+        assert len(out) == 2 * len(df)
+        assert sorted(out["Strike Price"].unique()) == expected
+    assert len(registry) == 2
+
+
+def test_typed_read_matches_detection(tmp_path):
+    registry = chain_schema.SchemaRegistry(str(tmp_path / "schemas.json"))
+    csv_bytes = _chain_frame().to_csv(index=False).encode("utf-8")
+
+    detected = chain_schema.read_option_chain(csv_bytes, "chain.csv", registry)
+    typed = chain_schema.read_option_chain(csv_bytes, "chain.csv", registry)
+
+    key = ["Strike Price", "OptionType"]
+    pd.testing.assert_frame_equal(
+        detected.sort_values(key).reset_index(drop=True)[typed.columns],
+        typed.sort_values(key).reset_index(drop=True),
+        check_dtype=False,
+    )
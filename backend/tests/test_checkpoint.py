@@ -0,0 +1,142 @@
+import gzip
+import json
+import os
+import re
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import checkpoint
+import globaldata_ws
+import main
+import shared_state
+from oi_flow import live_oi_flow
+
+
+def _tick(kind, strike, oi):
+    return {"InstrumentIdentifier": f"OPTIDX_NIFTY_26JUN2025_{kind}_{strike}", "OpenInterest": oi,
+            "Gamma": 0.001, "Delta": 0.5 if kind == "CE" else -0.5}
+
+
+def test_oi_flow_survives_a_checkpoint_round_trip(live_state):
+    grid = (24000, 2, 50)
+    live_oi_flow.on_tick(_tick("CE", 24000, 1000), *grid, t=60.0)
+    live_oi_flow.on_tick(_tick("PE", 24050, 500), *grid, t=61.0)
+    live_oi_flow.on_tick(_tick("CE", 24000, 1300), *grid, t=185.0)
+    before = live_oi_flow.matrix
+
+    snapshot = json.loads(json.dumps(checkpoint.build_snapshot()))
+    live_oi_flow.reset()
+    checkpoint.restore_checkpoint(snapshot)
+    after = live_oi_flow.matrix
+
+    np.testing.assert_array_equal(after.bucket_starts(), before.bucket_starts())
+    np.testing.assert_array_equal(after.window("oi"), before.window("oi"))
+    assert after.deltas_vs_open()["oi"].tolist() == before.deltas_vs_open()["oi"].tolist()
+
+    # the session open is kept: later ticks are measured against the pre-restart open
+    live_oi_flow.on_tick(_tick("CE", 24000, 1600), *grid, t=250.0)
+    assert after.deltas_vs_open()["call_oi"][2] == 600
+    assert after.window("oi").shape[0] == 4
+
+
+def _greeks_tick(kind, strike, oi=1000):
+    return {"InstrumentIdentifier": f"OPTIDX_NIFTY_26JUN2025_{kind}_{strike}", "OpenInterest": oi,
+            "Delta": 0.5 if kind == "CE" else -0.5, "Gamma": 0.001 if kind == "CE" else 0.0015,
+            "Vega": 5.0, "Theta": -3.0}
+
+
+def _write(path, snapshot):
+    with gzip.open(path, "wt", encoding="utf-8") as fh:
+        json.dump(snapshot, fh)
+
+
+@pytest.fixture
+def streaming(live_state):
+    live_state.live_stream_config = {"symbol": "NIFTY", "expiry": "26JUN2025", "spot": 24000,
+                                     "strike_range": 3, "contract_step": 50}
+    live_state.live_center_spot = 24000
+    live_state.live_strike_range = 3
+    live_state.live_contract_step = 50
+    for strike in range(23850, 24200, 50):
+        for kind in ("CE", "PE"):
+            # an older tick per instrument that the checkpoint can drop
+            globaldata_ws.live_ticks_cache.append(_greeks_tick(kind, strike, oi=1))
+            globaldata_ws.live_ticks_cache.append(_greeks_tick(kind, strike))
+    return live_state
+
+
+def test_nothing_to_save_without_a_stream(live_state, tmp_path):
+    path = str(tmp_path / "ckpt.json.gz")
+    assert checkpoint.save_checkpoint(path) is False
+    assert not os.path.exists(path)
+
+
+def test_save_and_load_round_trip(streaming, tmp_path):
+    path = str(tmp_path / "ckpt.json.gz")
+    streaming.trending_history.append({"time": "10:05", "netGex": 1.5})
+    assert checkpoint.save_checkpoint(path) is True
+
+    snapshot = checkpoint.load_checkpoint(path)
+    assert snapshot["stream_config"] == streaming.live_stream_config
+    assert snapshot["trending_history"] == [{"time": "10:05", "netGex": 1.5}]
+    # only the latest tick per instrument is kept
+    assert len(snapshot["live_ticks"]) == 14
+    assert all(tick["OpenInterest"] == 1000 for tick in snapshot["live_ticks"])
+
+
+@pytest.mark.parametrize("snapshot", [
+    {"version": checkpoint.CHECKPOINT_VERSION - 1},
+    {"version": checkpoint.CHECKPOINT_VERSION, "saved_at": 0},
+    ["not", "an", "object"],
+    "text",
+])
+def test_load_rejects_unusable_checkpoints(tmp_path, snapshot):
+    if isinstance(snapshot, dict) and "saved_at" not in snapshot:
+        snapshot["saved_at"] = time.time()
+    path = str(tmp_path / "ckpt.json.gz")
+    _write(path, snapshot)
+    assert checkpoint.load_checkpoint(path) is None
+
+
+def test_load_honours_max_age(tmp_path):
+    path = str(tmp_path / "ckpt.json.gz")
+    _write(path, {"version": checkpoint.CHECKPOINT_VERSION, "saved_at": time.time() - 120})
+    assert checkpoint.load_checkpoint(path, max_age=60) is None
+    assert checkpoint.load_checkpoint(path, max_age=600) is not None
+
+
+def test_load_ignores_a_corrupt_file(tmp_path):
+    path = tmp_path / "ckpt.json.gz"
+    path.write_bytes(b"not gzip")
+    assert checkpoint.load_checkpoint(str(path)) is None
+
+
+def test_restored_chain_is_served_stale_until_a_fresh_tick(streaming, tmp_path):
+    path = str(tmp_path / "ckpt.json.gz")
+    checkpoint.save_checkpoint(path)
+    expected = TestClient(main.app).get("/live_data").json()
+
+    globaldata_ws.live_ticks_cache.clear()
+    streaming.live_stream_config = {}
+    streaming.live_center_spot = 0
+    checkpoint.restore_checkpoint(checkpoint.load_checkpoint(path))
+
+    client = TestClient(main.app)
+    body = client.get("/live_data").json()
+    assert body["stale"] is True and body["as_of"] is not None
+    assert body["net_gex_1pct"] == expected["net_gex_1pct"]
+
+    globaldata_ws._append_parsed_tick(_greeks_tick("CE", 24000), re.compile(r"_(CE|PE)_(\d+)$"))
+    body = client.get("/live_data").json()
+    assert body["stale"] is False and body["as_of"] is None
+
+
+def test_restore_does_not_leak_into_later_tests():
+    # runs after the restore tests above: the live_state fixture put everything back
+    assert shared_state.live_restored_at is None
+    assert shared_state.live_stream_config == {}
+    assert globaldata_ws.live_ticks_cache == [] and globaldata_ws.live_quotes == {}
+    assert live_oi_flow.matrix is None
@@ -0,0 +1,63 @@
+import pytest
+
+from gex_alerts import AlertEngine
+
+
+def _engine(rules):
+    engine = AlertEngine()
+    engine.sinks = {"log": type("Null", (), {"emit": lambda self, alert: None})()}
+    engine.add_rules([dict(r, sinks=["log"]) for r in rules])
+    return engine
+
+
+def test_threshold_rules_fire_on_edges_only():
+    engine = _engine([{"id": f"r{i}", "metric": "net_gex", "op": ">", "value": 0} for i in range(500)])
+
+    fired = [len(engine.evaluate("NIFTY", {"net_gex": x}, now=float(t)))
+             for t, x in enumerate([1.0, 2.0, 3.0, -1.0, 1.0])]
+
+    assert fired == [500, 0, 0, 0, 500]
+
+
+def test_crossing_against_reference_metric():
+    engine = _engine([{"id": "zg", "metric": "spot", "op": "cross_below", "value": "zero_gamma"}])
+
+    fired = [engine.evaluate("NIFTY", {"spot": s, "zero_gamma": 24000.0}, now=float(t))
+             for t, s in enumerate([24100.0, 23950.0, 23900.0])]
+
+    assert [len(f) for f in fired] == [0, 1, 0]
+
+
+def test_webhooks_are_limited_to_loopback_and_replaced_cleanly():
+    engine = AlertEngine()
+    for url in ("http://example.com/hook", "file:///etc/passwd", "http://10.0.0.1/x", "ftp://127.0.0.1/"):
+        with pytest.raises(ValueError):
+            engine.add_webhook("hook", url)
+    with pytest.raises(ValueError):
+        engine.add_webhook("log", "http://127.0.0.1:9000/")
+
+    engine.add_webhook("hook", "http://127.0.0.1:9/first")
+    first = engine.sinks["hook"]
+    first.emit({"rule_id": "x"})
+    thread = first._thread
+    engine.add_webhook("hook", "http://[::1]:9/second")
+
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert engine.sinks["hook"].url == "http://[::1]:9/second"
+
+
+def test_rules_on_unchanged_metrics_are_skipped():
+    engine = _engine([
+        {"id": "wall", "metric": "gamma_wall", "op": "changed"},
+        {"id": "zg", "metric": "spot", "op": "cross_below", "value": "zero_gamma"},
+    ])
+    engine.evaluate("NIFTY", {"spot": 24100.0, "zero_gamma": 24000.0, "gamma_wall": 24000.0}, now=0.0)
+
+    # a spot-only update: the stale gamma wall value must not be compared or stored
+    spot_only = {"spot": 23950.0, "zero_gamma": 24000.0, "gamma_wall": 0.0}
+    fired = engine.evaluate("NIFTY", spot_only, now=1.0, changed=("spot", "net_gex"))
+    assert [a["rule_id"] for a in fired] == ["zg"]
+
+    fired = engine.evaluate("NIFTY", {"spot": 23950.0, "zero_gamma": 24000.0, "gamma_wall": 24000.0}, now=2.0)
+    assert fired == []
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+import gex_kernel
+from bench_compute_metrics import compute_metrics_reference, make_chain
+from gex_logic import compute_metrics
+
+KERNELS = {"numpy": gex_kernel._metrics_numpy, "loop": gex_kernel._metrics_loop}
+if gex_kernel.HAVE_NUMBA:
+    KERNELS["numba"] = gex_kernel._metrics_kernel
+
+
+def _edge_case_chain():
+    df = make_chain(200)
+    df.loc[3::23, "OI"] = np.nan
+    df.loc[5::19, "Theta"] = np.nan
+    df["OptionType"] = df["OptionType"].astype(object)
+    df.loc[7::29, "OptionType"] = None
+    return df
+
+
+@pytest.mark.parametrize("kernel", sorted(KERNELS))
+def test_kernels_match_pandas_reference(monkeypatch, kernel):
+    monkeypatch.setattr(gex_kernel, "_metrics_kernel", KERNELS[kernel])
+    df = _edge_case_chain()
+    ref = compute_metrics_reference(df.copy(), 24000, 75, 0.15, 0.05)
+    out = compute_metrics(df, 24000, 75, 0.15, 0.05)
+
+    assert list(out.columns) == list(ref.columns)
+    for col in gex_kernel.OUTPUT_COLUMNS:
+        np.testing.assert_allclose(out[col], ref[col], rtol=1e-9, equal_nan=True, err_msg=col)
+
+
+def test_compute_metrics_leaves_input_untouched():
+    df = make_chain(50)
+    before = df.copy()
+    compute_metrics(df, 24000, 75, 0.15, 0.05)
+    assert list(df.columns) == list(before.columns)
+    assert df.equals(before)
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from gex_logic import MIN_MAX_POINTS, process_all, _strike_series
+
+
+def _long_chain(strikes):
+    n = len(strikes)
+    return pd.DataFrame({
+        "Strike Price": np.repeat(strikes, 2).astype(float),
+        "OI": np.full(2 * n, 1000.0),
+        "Delta": np.tile([0.5, -0.5], n),
+        "Gamma": np.linspace(0.001, 0.002, 2 * n),
+        "Theta": np.full(2 * n, -3.0),
+        "OptionType": np.tile(["C", "P"], n),
+    })
+
+
+@pytest.mark.parametrize("strikes", [np.arange(100, 200, 2.5), np.arange(230.0, 241.0) / 100])
+def test_process_all_rejects_fractional_strike_grid(strikes):
+    with pytest.raises(ValueError, match="strike step"):
+        process_all(_long_chain(strikes), float(strikes[len(strikes) // 2]), n=3)
+
+
+def test_summary_without_zero_gamma_level():
+    # identical call/put legs: net GEX never changes sign
+    chain = _long_chain(np.arange(24000, 24500, 50))
+    chain["Gamma"] = 0.001
+    result = process_all(chain, 24200.0, n=3)
+    assert "Zero Gamma Level: n/a" in result["summary_text"]
+
+
+@pytest.mark.parametrize("kwargs", [{"max_points": 0}, {"max_points": MIN_MAX_POINTS - 1}, {"bucket": 0}, {"bucket": -2}])
+def test_process_all_rejects_bad_downsampling_bounds(kwargs):
+    strikes = np.arange(24000, 24500, 50)
+    with pytest.raises(ValueError):
+        process_all(_long_chain(strikes), 24200.0, n=3, **kwargs)
+
+
+def test_strike_series_drops_infinite_sums():
+    df = pd.DataFrame({"Strike Price": [100.0, 100.0, 105.0, 110.0], "GEX": [np.inf, 1.0, -np.inf, 2.0]})
+    _, values = _strike_series(df, "GEX")
+    assert values.tolist() == [0.0, 0.0, 2.0]
+
+
+def _wide_chain():
+    # 2000 strikes; zero gamma near 12000, gamma wall at 17000, spot at 15000:
+    # three separate protected groups and four free runs between them
+    strikes = np.arange(10000, 20000, 5)
+    chain = _long_chain(strikes)
+    is_put = chain["OptionType"] == "P"
+    chain["Gamma"] = np.where(is_put, np.where(chain["Strike Price"] < 12000, 0.002, 0.0005), 0.001)
+    chain.loc[chain["Strike Price"] == 17000, "OI"] = 1e6
+    return chain
+
+
+@pytest.mark.parametrize("max_points", [MIN_MAX_POINTS, 40, 300])
+def test_downsampled_series_are_bounded_and_keep_anchors_exact(max_points):
+    chain = _wide_chain()
+    full = process_all(chain, 15000.0, n=1000)
+    reduced = process_all(chain, 15000.0, n=1000, max_points=max_points)
+    assert reduced["gamma_wall_strike"] == 17000
+
+    for key in ("net_gex_1pct", "dealer_delta", "gex", "cumulative_gex", "vega_theta_ratio"):
+        points = reduced[key]
+        assert len(points) <= max_points, key
+        exact = {p["strike"]: p["value"] for p in points if "from" not in p}
+        full_values = {p["strike"]: p["value"] for p in full[key]}
+        for anchor in (11995, 12000, 14995, 15000, 16995, 17000):
+            assert exact[anchor] == full_values[anchor], (key, anchor)
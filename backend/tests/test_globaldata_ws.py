@@ -0,0 +1,114 @@
+import asyncio
+import json
+import re
+
+import globaldata_ws
+from live_chain import parse_option_data
+
+
+def test_chain_updates_coalesce_per_loop_iteration():
+    calls = []
+    globaldata_ws.add_chain_update_listener(calls.append)
+    try:
+        async def burst():
+            for _ in range(3):
+                globaldata_ws._notify_chain_update()
+            assert calls == []
+            await asyncio.sleep(0)
+
+        asyncio.run(burst())
+        assert calls == [globaldata_ws.chain_version]
+    finally:
+        globaldata_ws._chain_update_listeners.remove(calls.append)
+
+
+def test_failing_tick_listener_does_not_break_the_feed():
+    seen = []
+
+    def broken(tick):
+        raise ValueError("bad tick")
+
+    globaldata_ws.add_tick_listener(broken)
+    globaldata_ws.add_tick_listener(seen.append)
+    try:
+        tick = {"InstrumentIdentifier": "OPTIDX_NIFTY_26JUN2025_CE_24000", "OpenInterest": 10}
+        globaldata_ws._append_parsed_tick(tick, re.compile(r"_(CE|PE)_(\d+)$"))
+        assert [t["InstrumentIdentifier"] for t in seen] == [tick["InstrumentIdentifier"]]
+    finally:
+        globaldata_ws._tick_listeners.remove(broken)
+        globaldata_ws._tick_listeners.remove(seen.append)
+        globaldata_ws.live_ticks_cache.clear()
+
+
+class _FakeFeed:
+    """Stands in for websockets.connect(...): replays scripted messages, then drops."""
+
+    def __init__(self, messages):
+        self.messages = [json.dumps(m) for m in messages]
+        self.sent = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def send(self, payload):
+        self.sent.append(json.loads(payload))
+
+    async def recv(self):
+        if not self.messages:
+            raise ConnectionError("feed closed")
+        return self.messages.pop(0)
+
+
+def _run_feed(monkeypatch, messages):
+    feed = _FakeFeed(messages)
+    monkeypatch.setattr(globaldata_ws.websockets, "connect", lambda *args, **kwargs: feed)
+    sleep = asyncio.sleep
+    monkeypatch.setattr(asyncio, "sleep", lambda delay: sleep(0))
+    asyncio.run(globaldata_ws._ws_consumer("NIFTY", "26JUN2025", 24000, 3, 50))
+    return feed
+
+
+def test_futures_ticks_move_spot_only_for_the_stream_future(live_state, monkeypatch):
+    spots = []
+    globaldata_ws.add_spot_listener(spots.append)
+    try:
+        _run_feed(monkeypatch, [
+            {"MessageType": "AuthenticateResult", "Message": "Welcome!"},
+            {"MessageType": "LastQuoteResult", "LastTradePrice": 24010.0},
+            {"MessageType": "RealtimeResult", "InstrumentIdentifier": "NIFTY-I", "LastTradePrice": 24021.5},
+            {"MessageType": "RealtimeResult", "InstrumentIdentifier": "BANKNIFTY-I", "LastTradePrice": 51000.0},
+            {"MessageType": "RealtimeResult", "InstrumentIdentifier": "NIFTY-I", "LastTradePrice": 0},
+            {"MessageType": "RealtimeResult", "InstrumentIdentifier": "NIFTY-I", "LastTradePrice": -5.0},
+            {"MessageType": "RealtimeResult", "InstrumentIdentifier": "NIFTY-I", "LastTradePrice": None},
+            {"MessageType": "RealtimeResult", "InstrumentIdentifier": "NIFTY-I", "LastTradePrice": 24021.5},
+            {"MessageType": "RealtimeResult", "InstrumentIdentifier": "NIFTY-I", "LastTradePrice": 24019.0},
+        ])
+    finally:
+        globaldata_ws._spot_listeners.remove(spots.append)
+
+    assert spots == [24021.5, 24019.0]
+    assert live_state.live_spot == 24019.0
+    assert live_state.live_center_spot == 24000
+
+
+def test_option_quotes_reach_the_parsed_chain(live_state, monkeypatch):
+    ce, pe = "OPTIDX_NIFTY_26JUN2025_CE_24000", "OPTIDX_NIFTY_26JUN2025_PE_24000"
+    _run_feed(monkeypatch, [
+        {"MessageType": "AuthenticateResult", "Message": "Welcome!"},
+        {"MessageType": "RequestError", "Message": "no quote"},
+        {"MessageType": "RealtimeOptionChainGreeksResult", "Result": [
+            {"InstrumentIdentifier": ce, "OpenInterest": 900, "Delta": 0.5, "Gamma": 0.001, "Theta": -3.0},
+            {"InstrumentIdentifier": pe, "OpenInterest": 700, "Delta": -0.5, "Gamma": 0.001, "Theta": -3.0},
+        ]},
+        {"MessageType": "RealtimeOptionChainResult", "Result": [
+            {"InstrumentIdentifier": ce, "LastTradePrice": 120.5, "TotalQtyTraded": 5600, "OpenInterest": 900},
+            {"InstrumentIdentifier": pe, "LastTradePrice": 101.0, "TotalQtyTraded": 2100, "OpenInterest": 700},
+        ]},
+    ])
+
+    assert globaldata_ws.live_quotes[ce] == {"LTP": 120.5, "Volume": 5600, "OpenInterest": 900}
+    row = parse_option_data(globaldata_ws.live_ticks_cache, globaldata_ws.live_quotes).iloc[0]
+    assert (row["Call LTP"], row["Call Volume"], row["Put LTP"], row["Put Volume"]) == (120.5, 5600, 101.0, 2100)
@@ -0,0 +1,61 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import globaldata_ws
+import main
+from live_chain import compute_live_metrics, parse_option_data, spot_rescaler
+
+
+def _greeks_ticks(strikes):
+    ticks = []
+    for k in strikes:
+        for kind, delta, gamma in (("CE", 0.5, 0.0010), ("PE", -0.5, 0.0015)):
+            ticks.append({"InstrumentIdentifier": f"OPTIDX_NIFTY_26JUN2025_{kind}_{k}", "OpenInterest": 1000,
+                          "Delta": delta, "Gamma": gamma, "Vega": 5.0, "Theta": -3.0})
+    return ticks
+
+
+@pytest.fixture
+def live_chain(live_state):
+    live_state.live_center_spot = 24000
+    live_state.live_strike_range = 3
+    live_state.live_contract_step = 50
+    globaldata_ws.live_ticks_cache.extend(_greeks_ticks(range(23850, 24200, 50)))
+    return live_state
+
+
+@pytest.mark.parametrize("ltp, strike", [(24013.65, 24000), (24030.0, 24050), (23974.9, 23950)])
+def test_live_data_spot_sits_on_the_strike_grid(live_chain, ltp, strike):
+    live_chain.live_spot = ltp
+    body = TestClient(main.app).get("/live_data").json()
+    assert body["spot"] == strike
+    assert body["live_spot"] == ltp
+    assert strike in [p["strike"] for p in body["net_gex_1pct"]]
+
+
+@pytest.mark.parametrize("new_spot", [23910.0, 24000.0, 24087.5])
+def test_spot_rescale_matches_a_full_rebuild(live_chain, new_spot):
+    _, _, _, merged, zero_gamma = compute_live_metrics(parse_option_data(globaldata_ws.live_ticks_cache), spot=24013.0)
+    spot_rescaler.rebase(24013.0, {"spot": 24013.0, "net_gex": float(merged["Net GEX"].sum()), "zero_gamma": zero_gamma})
+
+    rescaled = spot_rescaler.at_spot(new_spot)
+    _, _, _, merged, zero_gamma = compute_live_metrics(parse_option_data(globaldata_ws.live_ticks_cache), spot=new_spot)
+    assert rescaled["spot"] == new_spot
+    assert rescaled["net_gex"] == pytest.approx(float(merged["Net GEX"].sum()), rel=1e-12)
+    assert rescaled["zero_gamma"] == pytest.approx(zero_gamma)
+
+
+def test_quotes_are_folded_into_the_parsed_chain():
+    ticks = _greeks_ticks([24000, 24050])
+    quotes = {
+        "OPTIDX_NIFTY_26JUN2025_CE_24000": {"LTP": 112.5, "Volume": 4200},
+        "OPTIDX_NIFTY_26JUN2025_PE_24050": {"LTP": 98.0, "Volume": 1300},
+        # quotes for strikes without Greeks are ignored
+        "OPTIDX_NIFTY_26JUN2025_CE_24100": {"LTP": 60.0, "Volume": 10},
+    }
+    df = parse_option_data(ticks, quotes).set_index("Strike Price")
+
+    assert sorted(df.index) == [24000, 24050]
+    assert (df.loc[24000, "Call LTP"], df.loc[24000, "Call Volume"]) == (112.5, 4200)
+    assert (df.loc[24050, "Put LTP"], df.loc[24050, "Put Volume"]) == (98.0, 1300)
+    assert (df.loc[24000, "Put LTP"], df.loc[24050, "Call Volume"]) == (0, 0)
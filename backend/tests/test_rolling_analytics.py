@@ -0,0 +1,109 @@
+import json
+import math
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from rolling_analytics import LiveAnalytics
+
+
+def test_mean_does_not_depend_on_update_rate():
+    analytics = LiveAnalytics(windows=(60,))
+    # 30 s at 1.0 from a single chain update, then 30 s at 3.0 from a burst of spot ticks
+    analytics.update(0.0, {"net_gex": 1.0})
+    for i in range(200):
+        analytics.update(30.0 + i * 0.15, {"net_gex": 3.0})
+    analytics.update(60.0, {"net_gex": 3.0})
+
+    stats = analytics.metrics["net_gex"].stats(60)
+    assert stats["mean"] == pytest.approx(2.0)
+    assert stats["std"] == pytest.approx(1.0)
+
+
+def _irregular_series(seed, n=600):
+    rng = np.random.default_rng(seed)
+    # bursts of fast ticks with occasional long gaps
+    gaps = np.where(rng.random(n) < 0.05, rng.uniform(20, 90, n), rng.exponential(0.5, n))
+    return np.cumsum(gaps), 1e12 + rng.normal(0, 5e10, n).cumsum()
+
+
+def _brute_force(ts, xs, seconds):
+    """Time-weighted mean / std over [t_last - seconds, t_last]; each value holds until the next."""
+    start = ts[-1] - seconds
+    weights = np.clip(ts[1:] - np.maximum(ts[:-1], start), 0, None)
+    mean = np.average(xs[:-1], weights=weights)
+    std = np.sqrt(np.average((xs[:-1] - mean) ** 2, weights=weights))
+    return mean, std
+
+
+def test_window_evicts_samples_that_ended_before_it():
+    analytics = LiveAnalytics(windows=(60,))
+    for t in range(0, 201, 10):
+        analytics.update(float(t), {"net_gex": float(t)})
+    window = analytics.metrics["net_gex"].windows[60]
+
+    # 140 is in force at the window start (140); everything older is gone
+    assert [t for t, _ in window.samples] == [140, 150, 160, 170, 180, 190, 200]
+    stats = window.stats()
+    assert stats["n"] == 7
+    assert stats["roc"] == pytest.approx(60.0)
+
+
+@pytest.mark.parametrize("seconds", [60, 300, 900])
+def test_mean_and_std_match_brute_force(seconds):
+    ts, xs = _irregular_series(seed=seconds)
+    analytics = LiveAnalytics(windows=(seconds,))
+    for i, (t, x) in enumerate(zip(ts, xs)):
+        analytics.update(t, {"net_gex": x})
+        if i % 50 == 49:
+            mean, std = _brute_force(ts[:i + 1], xs[:i + 1], seconds)
+            stats = analytics.metrics["net_gex"].stats(seconds)
+            assert stats["mean"] == pytest.approx(mean, rel=1e-9)
+            assert stats["std"] == pytest.approx(std, rel=1e-6)
+            assert stats["zscore"] == pytest.approx((x - mean) / std, rel=1e-6)
+
+
+def test_ema_decays_with_elapsed_time():
+    analytics = LiveAnalytics(windows=(60,))
+    ts = [0.0, 0.5, 1.0, 61.0, 61.2, 300.0]
+    xs = [10.0, 20.0, 20.0, 40.0, 0.0, 5.0]
+    emas = []
+    for i, (t, x) in enumerate(zip(ts, xs)):
+        analytics.update(t, {"net_gex": x})
+        ema = x if not emas else emas[-1] + (1 - math.exp(-(t - ts[i - 1]) / 60)) * (x - emas[-1])
+        emas.append(analytics.metrics["net_gex"].stats(60)["ema"])
+        assert emas[-1] == pytest.approx(ema)
+
+    # a quick tick barely moves the EMA; a gap of several windows lets the new value dominate
+    assert abs(emas[4] - emas[3]) < 0.01 * abs(xs[4] - emas[3])
+    assert abs(emas[5] - xs[5]) < 0.02 * abs(emas[4] - xs[5])
+
+
+def test_dump_and_replay_round_trip():
+    ts, xs = _irregular_series(seed=7, n=1500)
+    rng = np.random.default_rng(7)
+    original = LiveAnalytics()
+    for t, x in zip(ts, xs):
+        zero_gamma = None if rng.random() < 0.8 else 24000 + rng.normal(0, 20)
+        original.update(t, {"net_gex": x, "zero_gamma": zero_gamma, "dealer_delta": -x / 1e6})
+    assert ts[-1] - ts[0] > 2 * max(original.window_list)  # old events were evicted
+
+    restored = LiveAnalytics()
+    restored.replay(json.loads(json.dumps(original.dump_events())))
+    restored.load_ema(json.loads(json.dumps(original.dump_ema())))
+
+    assert restored.last_update == original.last_update
+    for name, metric in original.snapshot().items():
+        for w, stats in metric["windows"].items():
+            again = restored.snapshot()[name]["windows"][w]
+            assert again["n"] == stats["n"], (name, w)
+            for key in ("ema", "mean", "std", "zscore", "roc"):
+                assert again[key] == pytest.approx(stats[key], rel=1e-9, abs=1e-9), (name, w, key)
+
+
+def test_live_analytics_rejects_unknown_window():
+    response = TestClient(main.app).get("/live_analytics", params={"windows": [60, 42]})
+    assert response.status_code == 400
+    assert "42" in response.json()["detail"]